@@ -1,7 +1,146 @@
 import numpy as np
 import json
-from collections import defaultdict
-from scipy.signal import savgol_filter
+import types
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+TIMING_CLASSES = ("Peak", "Early (Rising)", "Late (Falling)")
+
+# Tactical class ids, indexing TACTICAL_CLASSES / TACTICAL_SCORES
+NEUTRAL, GOOD_AGGRESSION, PASSIVE_ERROR, HIGH_RISK_ERROR, SMART_SAFE_PLAY = range(5)
+TACTICAL_CLASSES = ("Neutral", "Good Aggression", "Passive Error", "High Risk Error", "Smart Safe Play")
+TACTICAL_SCORES = (50, 100, 20, 10, 90) # 0=Bad Choice, 50=Neutral, 100=Great Choice
+
+# Shot type -> (class on a high ball, class on a low ball); unlisted types stay Neutral
+SHOT_TYPE_TACTICS = {
+    'smash': (GOOD_AGGRESSION, HIGH_RISK_ERROR),
+    'drive': (GOOD_AGGRESSION, NEUTRAL),
+    'offensive': (GOOD_AGGRESSION, NEUTRAL),
+    'push': (PASSIVE_ERROR, SMART_SAFE_PLAY), # Passive on a high ball = missed opportunity
+    'block': (PASSIVE_ERROR, NEUTRAL),
+    'defensive': (PASSIVE_ERROR, NEUTRAL),
+    'flat hit': (NEUTRAL, HIGH_RISK_ERROR),
+    'loop': (NEUTRAL, SMART_SAFE_PLAY),
+    'drop': (NEUTRAL, SMART_SAFE_PLAY),
+}
+_NEUTRAL_TACTICS = (NEUTRAL, NEUTRAL)
+
+
+def _score_timing(contact_y, peak_y, t_contact, t_peak, net_y):
+    """Timing classification for one shot: returns (timing_class_id, timing_score, height_over_net)."""
+    # Calculate Height Diff (Positive = Hit below peak)
+    # Image coords: Peak Y is smaller. So Contact Y - Peak Y = drop amount in pixels
+    drop_pixels = contact_y - peak_y
+
+    # Heuristics (Pixels)
+    if drop_pixels < 15: # < ~5-10cm
+        timing_id = 0 # Peak
+        score = 100.0
+    elif t_contact < t_peak:
+        timing_id = 1 # Early (Rising)
+        score = 80.0 # Taking it early is often good for aggression
+    else:
+        timing_id = 2 # Late (Falling)
+        score = max(0.0, 100.0 - (drop_pixels / 2)) # Penalty for dropping too low
+
+    # Ball Height relative to Net (Positive = Above Net)
+    return timing_id, score, net_y - contact_y
+
+
+# Ball height bands relative to the net, the only thresholds tactical scoring depends on
+HIGH_BALL, MID_BALL, LOW_BALL = 1, 0, -1
+
+
+@lru_cache(maxsize=64)
+def _aggression_core(shot_type, bucket):
+    """(tactical_class, tactical_score) for a lowercased shot type in a ball-height bucket."""
+    high_ball_class, low_ball_class = SHOT_TYPE_TACTICS.get(shot_type, _NEUTRAL_TACTICS)
+    if bucket == HIGH_BALL:
+        tactical_id = high_ball_class
+    elif bucket == LOW_BALL:
+        tactical_id = low_ball_class
+    else:
+        tactical_id = NEUTRAL
+    return TACTICAL_CLASSES[tactical_id], TACTICAL_SCORES[tactical_id]
+
+
+def _average_sides(left, right):
+    """Left/right mean where both are present, else whichever side exists (NaN if neither)."""
+    return np.where(np.isnan(left), right, np.where(np.isnan(right), left, 0.5 * (left + right)))
+
+
+def _nanmean_or_zero(values):
+    """Mean of the recorded (non-NaN) entries, or 0 if none were recorded."""
+    recorded = values[~np.isnan(values)]
+    return recorded.mean() if recorded.size else 0
+
+
+# Per-frame columns built by StatsEngine._index_samples, in _sample_row order
+_SAMPLE_COLUMNS = ('t', 'ball_x', 'ball_y', 'ball_valid', 'has_player',
+                   'knee_left', 'knee_right', 'shoulder_left', 'shoulder_right', 'stance_width')
+_NO_BALL = (np.nan, np.nan, 0.0)
+_NO_PLAYER = (0.0, np.nan, np.nan, np.nan, np.nan, 0.0)
+
+
+def _sample_row(f):
+    """Flatten one frame sample into a tuple of _SAMPLE_COLUMNS values."""
+    b = f.get('ball', {})
+    # Handle simplified ball object in new JSON
+    ball = (b['x'], b['y'], 1.0) if b and b.get('x') is not None else _NO_BALL
+
+    player = f.get('player', {})
+    if player:
+        # New format has explicit angles
+        body = (1.0,
+                player.get('knee_angle_left') or np.nan,
+                player.get('knee_angle_right') or np.nan,
+                player.get('shoulder_angle_left') or np.nan,
+                player.get('shoulder_angle_right') or np.nan,
+                player.get('stance_width', 0) or 0)
+    else:
+        body = _NO_PLAYER
+    return (f['t'],) + ball + body
+
+
+# Event-stream equivalents of _sample_row, for StatsEngine.process_match_file
+_SAMPLE_PREFIX = 'frame_level_perception.samples.item'
+_SAMPLE_PLAYER_PREFIX = _SAMPLE_PREFIX + '.player'
+_SAMPLE_FIELDS = {
+    _SAMPLE_PREFIX + '.t': 0,
+    _SAMPLE_PREFIX + '.ball.x': 1,
+    _SAMPLE_PREFIX + '.ball.y': 2,
+    _SAMPLE_PLAYER_PREFIX + '.knee_angle_left': 5,
+    _SAMPLE_PLAYER_PREFIX + '.knee_angle_right': 6,
+    _SAMPLE_PLAYER_PREFIX + '.shoulder_angle_left': 7,
+    _SAMPLE_PLAYER_PREFIX + '.shoulder_angle_right': 8,
+    _SAMPLE_PLAYER_PREFIX + '.stance_width': 9,
+}
+_HAS_PLAYER = _SAMPLE_COLUMNS.index('has_player')
+_OBJECT_PREFIXES = frozenset(('court', 'shots.item', 'rallies.item'))
+
+
+def _finish_sample_row(row):
+    """Turn the raw field values collected for one streamed sample into a _sample_row tuple."""
+    t, x, y, _, has_player, knee_l, knee_r, shoulder_l, shoulder_r, stance = row
+    ball = (x, y, 1.0) if x is not None else _NO_BALL
+    if has_player:
+        body = (1.0, knee_l or np.nan, knee_r or np.nan, shoulder_l or np.nan,
+                shoulder_r or np.nan, stance or 0)
+    else:
+        body = _NO_PLAYER
+    return (t,) + ball + body
+
 
 class StatsEngine:
     def __init__(self, fps=30):
@@ -11,6 +150,34 @@ class StatsEngine:
         self.TABLE_LENGTH = 274.0  # cm (or relative units)
         self.TABLE_WIDTH = 152.5   # cm
         
+    @staticmethod
+    def parse(payload):
+        """
+        Parse a match JSON payload (bytes, str or a memoryview, e.g. over an mmap) into the dict process_match expects.
+        Uses orjson when installed; falls back to stdlib json, which also accepts NaN/Infinity literals.
+        """
+        if orjson is not None:
+            try:
+                return orjson.loads(payload)
+            except orjson.JSONDecodeError:
+                pass
+        if isinstance(payload, memoryview):
+            payload = payload.tobytes()
+        return json.loads(payload)
+
+    @staticmethod
+    def dumps(stats, pretty=True):
+        """Serialize stats as JSON text, 2-space indented or compact (orjson when installed, else stdlib json)."""
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0)
+            try:
+                return orjson.dumps(stats, option=option).decode()
+            except TypeError:
+                pass
+        if pretty:
+            return json.dumps(stats, indent=2)
+        return json.dumps(stats, separators=(',', ':'))
+
     def process_match(self, match_data):
         """
         Main pipeline: Enriched JSON -> Enhanced Stats
@@ -19,31 +186,90 @@ class StatsEngine:
         if not match_data:
             return {"error": "Invalid match data format"}
 
-        # Extract core data
-        self.court = match_data.get("court", {})
-        self.net_y = self.court.get("net_y", 335.0) # Default if missing
-        
+        return self._process(match_data.get("court", {}), match_data.get("shots", []),
+                             match_data.get("rallies", []),
+                             map(_sample_row, match_data.get('frame_level_perception', {}).get('samples', [])))
+
+    def process_match_file(self, path):
+        """
+        process_match for a match JSON file. With ijson installed the file is read in a single
+        streaming pass: court, shots and rallies are built as objects, while the frame samples go
+        straight into column rows without a dict per sample, which keeps peak memory near the size
+        of the arrays; otherwise the file is parsed whole.
+        """
+        if ijson is None:
+            with open(path, 'rb') as f:
+                return self.process_match(self.parse(f.read()))
+
+        court, shots, rallies, rows = None, [], [], []
+        row = None
+        with open(path, 'rb') as f:
+            events = ijson.parse(f, use_float=True)
+            for prefix, event, value in events:
+                # Hot path: one event per sample field, kept to a prefix test and a dict lookup
+                if prefix.startswith(_SAMPLE_PREFIX):
+                    col = _SAMPLE_FIELDS.get(prefix)
+                    if col is not None:
+                        row[col] = value
+                    elif prefix == _SAMPLE_PREFIX:
+                        if event == 'start_map':
+                            row = [None] * len(_SAMPLE_COLUMNS)
+                        elif event == 'end_map':
+                            rows.append(_finish_sample_row(row))
+                    elif prefix == _SAMPLE_PLAYER_PREFIX and event == 'map_key':
+                        row[_HAS_PLAYER] = 1.0
+                    continue
+                if prefix not in _OBJECT_PREFIXES:
+                    continue
+                target = prefix
+                if event in ('start_map', 'start_array'):
+                    # Replay this object's events into a builder, up to its matching end event
+                    end_event = event.replace('start', 'end')
+                    builder = ijson.ObjectBuilder()
+                    while (prefix, event) != (target, end_event):
+                        builder.event(event, value)
+                        prefix, event, value = next(events)
+                    builder.event(event, value)
+                    value = builder.value
+                if target == 'court':
+                    court = value
+                elif target == 'shots.item':
+                    shots.append(value)
+                else:
+                    rallies.append(value)
+
+        if court is None and not shots and not rallies:
+            return {"error": "Invalid match data format"}
+        return self._process(court or {}, shots, rallies, rows)
+
+    def _process(self, court, shots, rallies, sample_rows):
+        # Extract core data. Kept per call (in ctx below) rather than on self, so one
+        # engine can serve concurrent matches
+        net_y = float(court.get("net_y", 335.0)) # Default if missing
+
+        # Nothing to enrich: skip shot indexing and sample arrays entirely
+        if not rallies:
+            return {"match_summary": {}, "rallies": []}
+
+        # Index top-level shots once so each rally resolves its IDs directly
+        shots_by_id = {s["shot_id"]: s for s in shots if "shot_id" in s}
+
+        # Column arrays of frame samples, resolved once and passed down to every rally
+        ctx = self._index_samples(sample_rows)
+        ctx.net_y = net_y
+
         # 1. Enrich Shots with Advanced Metrics
         enriched_rallies = []
-        
-        # Process rallies existing in the input
-        # Handle new format where rallies is a list of dicts with 'shots' as IDs
-        for rally in match_data.get("rallies", []):
-            rally_id = rally.get("rally_id")
-            # Find shots for this rally
+        for rally in rallies:
+            # Handle new format where rallies is a list of dicts with 'shots' as IDs
             rally_shot_ids = rally.get("shots", [])
-            
-            # Get actual shot objects from the top-level 'shots' list
-            all_shots = match_data.get("shots", [])
-            rally_shots_data = [
-                s for s in all_shots 
-                if s.get("shot_id") in rally_shot_ids
-            ]
-            
-            # Analyze this rally
-            stats = self._analyze_rally_enriched(rally_id, rally, rally_shots_data, match_data)
-            enriched_rallies.append(stats)
-            
+
+            # Get actual shot objects from the shot_id index
+            rally_shots_data = [shots_by_id[i] for i in rally_shot_ids if i in shots_by_id]
+
+            enriched_rallies.append(
+                self._analyze_rally_enriched(rally.get("rally_id"), rally, rally_shots_data, ctx))
+
         # 2. Aggregated Match Stats
         match_summary = self._aggregate_match_stats(enriched_rallies)
         
@@ -52,19 +278,16 @@ class StatsEngine:
             "rallies": enriched_rallies
         }
 
-    def _analyze_rally_enriched(self, rally_id, rally_meta, shots_data, full_data):
+    def _analyze_rally_enriched(self, rally_id, rally_meta, shots_data, ctx):
         """
         Compute shot-by-shot metrics using the pre-detected shots and adding new physics metrics.
+        ctx: frame-sample arrays from _index_samples
         """
-        # Calculate Rhythm (Inter-shot intervals)
-        intervals = []
+        # Calculate Rhythm (std of inter-shot intervals, sorted by time just in case)
         if len(shots_data) > 1:
-            # Sort by time just in case
-            sorted_shots = sorted(shots_data, key=lambda x: x.get('t_contact', 0))
-            for i in range(1, len(sorted_shots)):
-                interval = sorted_shots[i]['t_contact'] - sorted_shots[i-1]['t_contact']
-                intervals.append(interval) 
-            rhythm_consistency = np.std(intervals) if intervals else 0
+            contact_times = np.sort(np.fromiter((s['t_contact'] for s in shots_data),
+                                                dtype=np.float64, count=len(shots_data)))
+            rhythm_consistency = float(np.std(np.diff(contact_times)))
         else:
             rhythm_consistency = 0
 
@@ -74,26 +297,23 @@ class StatsEngine:
             # 1. Contact Height & Timing Analysis
             # We need ball trajectory AROUND the contact time to find peak
             contact_t = shot.get('t_contact')
-            # Handle list vs dict for samples (JSON structure check)
-            samples = full_data.get('frame_level_perception', {}).get('samples', [])
-            trajectory = self._get_trajectory_segment(samples, contact_t - 0.5, contact_t + 0.5)
-            
+            t_arr, x_arr, y_arr = self._get_trajectory_segment(ctx, contact_t - 0.5, contact_t + 0.5)
+
             # Timing Score
-            timing_stats = self._calculate_timing_metrics(shot, trajectory)
+            timing_stats = self._calculate_timing_metrics(shot, t_arr, x_arr, y_arr, ctx.net_y)
             
             # Aggression/Tactical Score
-            tactical_stats = self._calculate_aggression_opportunity(shot, timing_stats['contact_height'])
-            
-            # Merge into shot object
-            shot_enriched = shot.copy()
-            shot_enriched.update(timing_stats)
-            shot_enriched.update(tactical_stats)
+            tactical_stats = self._calculate_aggression_opportunity(shot, timing_stats['contact_height'], ctx.net_y)
             
+            # Merge into shot object in one construction
             # Add Skeleton Analysis if available (at contact frame)
             # Make sure shot dict has 'skeleton_analysis' key
-            shot_enriched['skeleton_analysis'] = self._analyze_skeleton(full_data, contact_t)
-            
-            enriched_shots.append(shot_enriched)
+            enriched_shots.append({
+                **shot,
+                **timing_stats,
+                **tactical_stats,
+                'skeleton_analysis': self._analyze_skeleton(ctx, contact_t),
+            })
 
         return {
             "id": rally_id,
@@ -103,133 +323,121 @@ class StatsEngine:
             "shots": enriched_shots
         }
 
-    def _get_trajectory_segment(self, frames, t_start, t_end):
-        """Extract ball sequence [t, x, y] for a time window."""
-        segment = []
-        for f in frames:
-            if t_start <= f['t'] <= t_end:
-                b = f.get('ball', {})
-                # Handle simplified ball object in new JSON
-                if b and b.get('x') is not None:
-                    segment.append({'t': f['t'], 'y': b['y'], 'x': b['x']})
-        return segment
-
-    def _calculate_timing_metrics(self, shot, trajectory):
+    def _index_samples(self, sample_rows):
+        """
+        Convert time-ordered frame samples, as _sample_row tuples, into a structure of NumPy arrays,
+        one entry per frame: time, ball x/y plus a valid-ball mask, and the player's joint angles /
+        stance width. Missing (or zero) angles are stored as NaN. Returns the namespace.
+        """
+        rows = np.array(list(sample_rows), dtype=np.float64).reshape(-1, len(_SAMPLE_COLUMNS))
+        ctx = types.SimpleNamespace(skeleton_cache={})
+        for i, name in enumerate(_SAMPLE_COLUMNS):
+            setattr(ctx, name, np.ascontiguousarray(rows[:, i]))
+        ctx.ball_valid = ctx.ball_valid.astype(bool)
+        ctx.has_player = ctx.has_player.astype(bool)
+
+        # Calculate averages for every frame at once
+        ctx.knee_avg = _average_sides(ctx.knee_left, ctx.knee_right)
+        ctx.shoulder_avg = _average_sides(ctx.shoulder_left, ctx.shoulder_right)
+        return ctx
+
+    def _get_trajectory_segment(self, ctx, t_start, t_end):
+        """Extract ball sequence (t, x, y) arrays for a time window."""
+        lo = np.searchsorted(ctx.t, t_start, side='left')
+        hi = np.searchsorted(ctx.t, t_end, side='right')
+        valid = ctx.ball_valid[lo:hi]
+        return ctx.t[lo:hi][valid], ctx.ball_x[lo:hi][valid], ctx.ball_y[lo:hi][valid]
+
+    def _calculate_timing_metrics(self, shot, t_arr, x_arr, y_arr, net_y):
         """
         Calculate if shot was taken at Peak, Early (Rising), or Late (Falling).
-        Input: shot dict, trajectory list [{'t', 'y', 'x'}]
+        Input: shot dict, trajectory arrays t/x/y (same length), net line y
         """
-        if not trajectory:
+        if t_arr.size == 0:
             return {"timing": "Unknown", "contact_height": 0, "timing_score": 0}
-            
+
         # Find contact frame (closest matching timestamp)
         contact_t = shot.get('t_contact', 0)
-        contact_point = min(trajectory, key=lambda p: abs(p['t'] - contact_t))
-        contact_y = contact_point['y']
-        
+        i_contact = int(np.argmin(np.abs(t_arr - contact_t)))
+        contact_y = float(y_arr[i_contact])
+
         # Find Peak Height (Minimum Y value in image coords) in this trajectory segment
         # We search a bit before contact to find the bounce peak
-        peak_point = min(trajectory, key=lambda p: p['y'])
-        peak_y = peak_point['y']
-        
-        # Calculate Height Diff (Positive = Hit below peak)
-        # Image coords: Peak Y is smaller. So Contact Y - Peak Y = drop amount in pixels
-        drop_pixels = contact_y - peak_y
-        
-        # Heuristics (Pixels)
-        if drop_pixels < 15: # < ~5-10cm
-            timing = "Peak"
-            score = 100
-        elif contact_point['t'] < peak_point['t']: 
-            timing = "Early (Rising)"
-            score = 80 # Taking it early is often good for aggression
-        else:
-            timing = "Late (Falling)"
-            score = max(0, 100 - (drop_pixels / 2)) # Penalty for dropping too low
-            
-        # Ball Height relative to Net (Positive = Above Net)
-        height_over_net = self.net_y - contact_y
-            
+        i_peak = int(np.argmin(y_arr))
+        peak_y = float(y_arr[i_peak])
+
+        timing_id, score, height_over_net = _score_timing(
+            contact_y, peak_y, float(t_arr[i_contact]), float(t_arr[i_peak]), net_y)
+
         return {
-            "timing_class": timing,
+            "timing_class": TIMING_CLASSES[timing_id],
             "timing_score": round(score),
             "height_over_net": height_over_net,
             "contact_height": contact_y
         }
 
-    def _calculate_aggression_opportunity(self, shot, contact_height_y):
+    def _calculate_aggression_opportunity(self, shot, contact_height_y, net_y):
         """
         Detect Tactical Errors: Passive shot on High Ball vs Risky shot on Low Ball.
         """
         # Height relative to Net
-        rel_height = self.net_y - contact_height_y # Positive = Above net
-        
-        shot_type = shot.get('shot_type', 'unknown').lower()
-        
-        tactical_assessment = "Neutral"
-        opportunity_score = 50 # 0=Bad Choice, 50=Neutral, 100=Great Choice
-        
+        rel_height = net_y - contact_height_y # Positive = Above net
+
         # Scenario 1: High Ball Opportunity (> 40px above net ~ 15cm)
-        if rel_height > 40:
-            if shot_type in ['smash', 'drive', 'offensive']:
-                tactical_assessment = "Good Aggression"
-                opportunity_score = 100
-            elif shot_type in ['push', 'block', 'defensive']:
-                tactical_assessment = "Passive Error" # Missed opportunity
-                opportunity_score = 20
-        
         # Scenario 2: Low Ball Risk (< 0px, below net)
+        if rel_height > 40:
+            bucket = HIGH_BALL
         elif rel_height < 0:
-            if shot_type in ['smash', 'flat hit']:
-                tactical_assessment = "High Risk Error"
-                opportunity_score = 10
-            elif shot_type in ['loop', 'push', 'drop']:
-                tactical_assessment = "Smart Safe Play"
-                opportunity_score = 90
-                
+            bucket = LOW_BALL
+        else:
+            bucket = MID_BALL
+
+        shot_type = shot.get('shot_type', 'unknown').lower()
+        tactical_class, tactical_score = _aggression_core(shot_type, bucket)
+
         return {
-            "tactical_class": tactical_assessment,
-            "tactical_score": opportunity_score
+            "tactical_class": tactical_class,
+            "tactical_score": tactical_score
         }
 
-    def _analyze_skeleton(self, full_data, contact_t):
+    def _nearest_sample_index(self, ctx, t):
+        """Index of the frame sample closest to t (earliest wins ties), or None if there are no samples."""
+        sample_t = ctx.t
+        n = sample_t.size
+        if n == 0:
+            return None
+        idx = int(np.searchsorted(sample_t, t, side='left'))
+        if idx >= n or (idx > 0 and t - sample_t[idx - 1] <= sample_t[idx] - t):
+            # Previous sample is at least as close; step back to its first duplicate
+            idx = int(np.searchsorted(sample_t, sample_t[idx - 1], side='left'))
+        return idx
+
+    def _analyze_skeleton(self, ctx, contact_t):
         """
         Extract pre-calculated Knee/Shoulder angles at contact time if available.
         """
-        # Find frame samples near contact
-        samples = full_data.get('frame_level_perception', {}).get('samples', [])
-        frame = min(samples, key=lambda f: abs(f['t'] - contact_t), default=None)
-        
-        if not frame: return {}
-        
-        player = frame.get('player', {})
-        if not player: return {}
-        
-        # New format has explicit angles
-        knee_left = player.get('knee_angle_left')
-        knee_right = player.get('knee_angle_right')
-        shoulder_left = player.get('shoulder_angle_left')
-        shoulder_right = player.get('shoulder_angle_right')
-        
-        # Calculate averages if both present, or use single value
-        avg_knee = None
-        if knee_left and knee_right:
-            avg_knee = (knee_left + knee_right) / 2
-        elif knee_left: avg_knee = knee_left
-        elif knee_right: avg_knee = knee_right
-            
-        avg_shoulder = None
-        if shoulder_left and shoulder_right:
-            avg_shoulder = (shoulder_left + shoulder_right) / 2
-        elif shoulder_left: avg_shoulder = shoulder_left
-        elif shoulder_right: avg_shoulder = shoulder_right
-            
-        stance_width = player.get('stance_width', 0)
-            
+        # Find frame sample nearest contact; shots landing on the same frame share the result
+        idx = self._nearest_sample_index(ctx, contact_t)
+        if idx is None: return {}
+        if idx not in ctx.skeleton_cache:
+            ctx.skeleton_cache[idx] = self._skeleton_at_index(ctx, idx)
+        return ctx.skeleton_cache[idx]
+
+    def _skeleton_at_index(self, ctx, idx):
+        """Knee/Shoulder summary for a single frame sample."""
+        if not ctx.has_player[idx]: return {}
+
+        avg_knee = float(ctx.knee_avg[idx])
+        avg_shoulder = float(ctx.shoulder_avg[idx])
+        has_knee = not np.isnan(avg_knee)
+        has_shoulder = not np.isnan(avg_shoulder)
+
+        stance_width = float(ctx.stance_width[idx])
+
         return {
-            "has_skeleton": True if avg_knee is not None else False,
-            "avg_knee_angle": round(avg_knee, 1) if avg_knee else None,
-            "avg_shoulder_angle": round(avg_shoulder, 1) if avg_shoulder else None,
+            "has_skeleton": has_knee,
+            "avg_knee_angle": round(avg_knee, 1) if has_knee and avg_knee else None,
+            "avg_shoulder_angle": round(avg_shoulder, 1) if has_shoulder and avg_shoulder else None,
             "stance_width": stance_width
         }
 
@@ -243,57 +451,67 @@ class StatsEngine:
         rhythms = [r['rhythm_consistency'] for r in rally_stats]
         avg_rhythm = np.mean(rhythms) if rhythms else 0
         
-        # Timing Stats
-        timings = [s.get('timing_score', 0) for r in rally_stats for s in r['shots']]
-        avg_timing = np.mean(timings) if timings else 0
-
-        # Tactical Stats
-        tactics = [s.get('tactical_score', 0) for r in rally_stats for s in r['shots']]
-        avg_tactics = np.mean(tactics) if tactics else 0
-
-        # Shot stats
-        shot_types = defaultdict(int)
-        landing_zones = defaultdict(int)
-        difficulty_scores = []
-        knee_angles = []
-        shoulder_angles = []
-        stance_widths = []
-        speeds = []
-        
-        for r in rally_stats:
-            for s in r['shots']:
-                shot_types[s.get('shot_type', 'unknown')] += 1
-                # Estimate difficulty if not present (could be added to _analyze_rally_enriched)
-                difficulty_scores.append(s.get('difficulty_score', 0))
-                
-                # Biomechanics
-                skel = s.get('skeleton_analysis', {})
-                if skel.get('has_skeleton'):
-                    if skel.get('avg_knee_angle'): knee_angles.append(skel['avg_knee_angle'])
-                    if skel.get('avg_shoulder_angle'): shoulder_angles.append(skel['avg_shoulder_angle'])
-                    if skel.get('stance_width'): stance_widths.append(skel['stance_width'])
-                    
-                # Speed
-                # If speed is in shot object
-                if s.get('speed'): speeds.append(s['speed'])
-                # Or try to extract from raw JSON if available (but 's' here is the shot object)
-                
-                # Landing Zone Heatmap
-                landing = s.get('landing', {})
-                if landing and landing.get('zone'):
-                    landing_zones[landing['zone']] += 1
+        # Single pass over every shot into preallocated per-field arrays (NaN = not recorded)
+        timings = np.empty(total_shots)
+        tactics = np.empty(total_shots)
+        difficulty_scores = np.empty(total_shots)
+        knee_angles = np.full(total_shots, np.nan)
+        shoulder_angles = np.full(total_shots, np.nan)
+        stance_widths = np.full(total_shots, np.nan)
+        speeds = np.full(total_shots, np.nan)
+        shot_types = Counter()
+        landing_zones = Counter()
+
+        all_shots = chain.from_iterable(r['shots'] for r in rally_stats)
+        for i, s in enumerate(all_shots):
+            # Timing / Tactical Stats
+            timings[i] = s.get('timing_score', 0)
+            tactics[i] = s.get('tactical_score', 0)
+
+            shot_types[s.get('shot_type', 'unknown')] += 1
+            # Estimate difficulty if not present (could be added to _analyze_rally_enriched)
+            difficulty_scores[i] = s.get('difficulty_score', 0)
+
+            # Biomechanics
+            skel = s.get('skeleton_analysis', {})
+            if skel.get('has_skeleton'):
+                if skel.get('avg_knee_angle'): knee_angles[i] = skel['avg_knee_angle']
+                if skel.get('avg_shoulder_angle'): shoulder_angles[i] = skel['avg_shoulder_angle']
+                if skel.get('stance_width'): stance_widths[i] = skel['stance_width']
+
+            # Speed
+            # If speed is in shot object
+            if s.get('speed'): speeds[i] = s['speed']
+            # Or try to extract from raw JSON if available (but 's' here is the shot object)
+
+            # Landing Zone Heatmap
+            landing = s.get('landing', {})
+            if landing and landing.get('zone'):
+                landing_zones[landing['zone']] += 1
+
+        # Round all per-shot averages in one vectorized call; tolist() yields plain Python floats
+        (avg_timing, avg_tactics, avg_speed, avg_knee, avg_shoulder,
+         avg_stance, avg_difficulty) = np.round([
+            timings.mean() if total_shots else 0,
+            tactics.mean() if total_shots else 0,
+            _nanmean_or_zero(speeds),
+            _nanmean_or_zero(knee_angles),
+            _nanmean_or_zero(shoulder_angles),
+            _nanmean_or_zero(stance_widths),
+            difficulty_scores.mean() if total_shots else 0,
+        ], 1).tolist()
 
         return {
             "total_rallies": len(rally_stats),
             "total_shots": total_shots,
-            "avg_rhythm_score": round(avg_rhythm, 2),
-            "avg_timing_score": round(avg_timing, 1),
-            "avg_tactical_score": round(avg_tactics, 1),
-            "avg_shot_speed": round(np.mean(speeds), 1) if speeds else 0,
-            "avg_knee_angle": round(np.mean(knee_angles), 1) if knee_angles else 0,
-            "avg_shoulder_angle": round(np.mean(shoulder_angles), 1) if shoulder_angles else 0,
-            "avg_stance_width": round(np.mean(stance_widths), 1) if stance_widths else 0,
+            "avg_rhythm_score": float(round(avg_rhythm, 2)),
+            "avg_timing_score": avg_timing,
+            "avg_tactical_score": avg_tactics,
+            "avg_shot_speed": avg_speed,
+            "avg_knee_angle": avg_knee,
+            "avg_shoulder_angle": avg_shoulder,
+            "avg_stance_width": avg_stance,
             "shot_type_distribution": dict(shot_types),
             "landing_zone_heatmap": dict(landing_zones),
-            "avg_shot_difficulty": round(np.mean(difficulty_scores), 1) if difficulty_scores else 0
+            "avg_shot_difficulty": avg_difficulty
         }
@@ -2,7 +2,6 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from HH.stats_engine import StatsEngine
-import json
 import numpy as np
 
 def generate_dummy_data():
@@ -64,7 +63,7 @@ def test_engine():
     
     # 4. Verify Output
     print("\n--- Match Summary ---")
-    print(json.dumps(result['match_summary'], indent=2))
+    print(StatsEngine.dumps(result['match_summary']))
     
     print(f"\n--- Rallies Found: " + str(len(result['rallies'])) + " ---")
     for r in result['rallies']:
@@ -16,31 +16,150 @@ Strategy order:
   4. Direct Canny + Hough
   5. Surface color contour (last resort)
 """
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    # Numba is optional: the scan kernels below run as plain Python (or a NumPy equivalent) without it
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+# Optional CUDA path for the border-line masks; needs an OpenCV build with the cuda modules.
+# Off unless COURT_DETECT_CUDA=1 is set, and checked against the CPU masks on first use.
+CUDA_ENABLED = os.environ.get('COURT_DETECT_CUDA', '') == '1'
+try:
+    CUDA_AVAILABLE = CUDA_ENABLED and cv2.cuda.getCudaEnabledDeviceCount() > 0
+except (AttributeError, cv2.error):
+    CUDA_AVAILABLE = False
+
+# Per-strategy diagnostics go to DEBUG, so they cost nothing unless enabled
+logger = logging.getLogger(__name__)
+
+# Structuring elements, built once instead of per call
+_K3_RECT = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+_K5_ELLIPSE = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+_K7_ELLIPSE = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
+_K15_ELLIPSE = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
+
+
+class _ScratchPool(threading.local):
+    """Per-thread uint8 work buffers, reused across frames of the same size.
+    A buffer's contents are only valid until the next get() of the same name, so
+    nothing handed out here may be returned to callers."""
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape):
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+
+_scratch = _ScratchPool()
+
+
+class _FrameHsv(threading.local):
+    """Full-frame HSV conversion of the frame being detected, made at most once per detection.
+    Holds the frame itself (not its address), and _run_strategies clears it when done."""
+
+    def __init__(self):
+        self.frame = None
+        self.hsv = None
+
+    def get(self, frame):
+        if self.frame is not frame:
+            self.frame, self.hsv = frame, cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return self.hsv
+
+    def clear(self):
+        self.frame = self.hsv = None
+
+
+_frame_hsv = _FrameHsv()
+
+
+def _clear_outside(mask, y1, y2, x1, x2):
+    """Zero `mask` outside rows y1:y2 / columns x1:x2, in place (same as AND-ing with a zone mask)."""
+    mask[:y1] = 0
+    mask[y2:] = 0
+    mask[:, :x1] = 0
+    mask[:, x2:] = 0
+
 # ============================================================
 # GEOMETRY HELPERS
 # ============================================================
 
+@njit(cache=True)
+def _line_intersection_kernel(x1, y1, x2, y2, x3, y3, x4, y4):
+    """Intersection of line (x1,y1)->(x2,y2) and line (x3,y3)->(x4,y4) as (ok, x, y)."""
+    d1x, d1y = x2 - x1, y2 - y1
+    d2x, d2y = x4 - x3, y4 - y3
+    cross = d1x * d2y - d1y * d2x
+    if abs(cross) < 1e-8:
+        return False, 0.0, 0.0
+    t = ((x3 - x1) * d2y - (y3 - y1) * d2x) / cross
+    return True, x1 + d1x * t, y1 + d1y * t
+
+
+@njit(cache=True)
+def _angle_deg_kernel(dx, dy):
+    return math.degrees(math.atan2(abs(dy), abs(dx)))
+
+
+@njit(cache=True)
+def _seg_length_kernel(x1, y1, x2, y2):
+    return math.hypot(x2 - x1, y2 - y1)
+
+
 def _line_intersection(p1, p2, p3, p4):
     """Intersection of line(p1->p2) and line(p3->p4). Returns (x,y) or None."""
-    d1 = np.array([p2[0] - p1[0], p2[1] - p1[1]], dtype=np.float64)
-    d2 = np.array([p4[0] - p3[0], p4[1] - p3[1]], dtype=np.float64)
-    cross = d1[0] * d2[1] - d1[1] * d2[0]
-    if abs(cross) < 1e-8:
-        return None
-    x = np.array([p3[0] - p1[0], p3[1] - p1[1]], dtype=np.float64)
-    t = (x[0] * d2[1] - x[1] * d2[0]) / cross
-    return (float(p1[0] + d1[0] * t), float(p1[1] + d1[1] * t))
+    ok, x, y = _line_intersection_kernel(float(p1[0]), float(p1[1]), float(p2[0]), float(p2[1]),
+                                         float(p3[0]), float(p3[1]), float(p4[0]), float(p4[1]))
+    return (x, y) if ok else None
 
 
 def _angle_deg(dx, dy):
-    return np.degrees(np.arctan2(abs(dy), abs(dx)))
+    return _angle_deg_kernel(float(dx), float(dy))
 
 
 def _seg_length(seg):
-    return np.sqrt((seg[2] - seg[0]) ** 2 + (seg[3] - seg[1]) ** 2)
+    return _seg_length_kernel(float(seg[0]), float(seg[1]), float(seg[2]), float(seg[3]))
+
+
+def _seg_angle_length(segs):
+    """Per-segment angle from horizontal (degrees, 0-90) and length for an (N, 4) segment array."""
+    pts = np.asarray(segs, dtype=np.float64)
+    dx = pts[:, 2] - pts[:, 0]
+    dy = pts[:, 3] - pts[:, 1]
+    return np.degrees(np.arctan2(np.abs(dy), np.abs(dx))), np.hypot(dx, dy)
+
+
+def _longest(lengths, keep):
+    """Index of the first longest segment among those with `keep` set, or -1 if none are."""
+    cand = np.flatnonzero(keep)
+    if len(cand) == 0:
+        return -1
+    return int(cand[np.argmax(lengths[cand])])
+
+
+def _corner_dist(corners, i, j):
+    """Distance between corners[i] and corners[j] of a (4, 2) corner array."""
+    return math.hypot(corners[i, 0] - corners[j, 0], corners[i, 1] - corners[j, 1])
 
 
 def _order_corners(pts):
@@ -54,22 +173,23 @@ def _order_corners(pts):
     return np.array([tl, tr, br, bl], dtype=np.float32)
 
 
-def _valid_table(corners, frame_h=0, frame_w=0, min_area=2000, aspect_range=(1.4, 5.0)):
-    if corners is None or len(corners) != 4:
-        return False
-    area = cv2.contourArea(corners.reshape(-1, 1, 2).astype(np.float32))
+@njit(cache=True)
+def _valid_table_kernel(x0, y0, x1, y1, x2, y2, x3, y3, frame_h, frame_w,
+                        min_area, aspect_lo, aspect_hi):
+    area = abs((x0 * y1 - x1 * y0) + (x1 * y2 - x2 * y1)
+               + (x2 * y3 - x3 * y2) + (x3 * y0 - x0 * y3)) / 2.0
     if area < min_area:
         return False
-    w1 = np.linalg.norm(corners[1] - corners[0])
-    w2 = np.linalg.norm(corners[2] - corners[3])
-    h1 = np.linalg.norm(corners[3] - corners[0])
-    h2 = np.linalg.norm(corners[2] - corners[1])
+    w1 = math.hypot(x1 - x0, y1 - y0)
+    w2 = math.hypot(x2 - x3, y2 - y3)
+    h1 = math.hypot(x3 - x0, y3 - y0)
+    h2 = math.hypot(x2 - x1, y2 - y1)
     tw = (w1 + w2) / 2
     th = (h1 + h2) / 2
     if tw < 40 or th < 20:
         return False
     aspect = tw / (th + 1e-6)
-    if not (aspect_range[0] <= aspect <= aspect_range[1]):
+    if not (aspect_lo <= aspect <= aspect_hi):
         return False
     if frame_w > 0 and tw > frame_w * 0.50:
         return False
@@ -78,36 +198,38 @@ def _valid_table(corners, frame_h=0, frame_w=0, min_area=2000, aspect_range=(1.4
     return True
 
 
-# ============================================================
-# STRATEGY 0: Find table surface first, then find the 5 lines
-# (4 edges + net) on it. Surface constrains where to look.
-# ============================================================
+def _valid_table(corners, frame_h=0, frame_w=0, min_area=2000, aspect_range=(1.4, 5.0)):
+    if corners is None or len(corners) != 4:
+        return False
+    pts = np.asarray(corners, dtype=np.float64).reshape(-1).tolist()
+    if len(pts) != 8:
+        return False
+    return _valid_table_kernel(*pts, float(frame_h), float(frame_w), float(min_area),
+                               float(aspect_range[0]), float(aspect_range[1]))
 
-def _find_surface_roi(frame):
+
+def _find_surface_roi(frame, hsv=None):
     """
     Quickly find the approximate bounding box of the table playing surface
     using color segmentation. Returns (y_top, y_bot, x_left, x_right) or None.
+    Pass the caller's `hsv` conversion of `frame` to avoid converting twice.
     """
     h, w = frame.shape[:2]
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    if hsv is None:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
 
-    # Table surface: dark blue / dark green / teal
-    blue = cv2.inRange(hsv, (90, 30, 20), (130, 255, 200))
-    green = cv2.inRange(hsv, (35, 30, 20), (90, 255, 200))
-    teal = cv2.inRange(hsv, (80, 20, 15), (135, 255, 220))
-    mask = blue | green | teal
+    # Table surface: dark green / teal, OR-ed in place. Dark blue (90-130, S>=30, V 20-200)
+    # lies entirely inside the teal box, so it needs no pass of its own
+    mask = cv2.inRange(hsv, (35, 30, 20), (90, 255, 200), dst=_scratch.get('surface', (h, w)))
+    teal = cv2.inRange(hsv, (80, 20, 15), (135, 255, 220), dst=_scratch.get('surface_tmp', (h, w)))
+    cv2.bitwise_or(mask, teal, dst=mask)
 
     # Center zone only
-    zone = np.zeros_like(mask)
-    y1z, y2z = int(h * 0.10), int(h * 0.85)
-    x1z, x2z = int(w * 0.05), int(w * 0.95)
-    zone[y1z:y2z, x1z:x2z] = 255
-    mask = mask & zone
+    _clear_outside(mask, int(h * 0.10), int(h * 0.85), int(w * 0.05), int(w * 0.95))
 
     # Close small gaps
-    k5 = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, k5, iterations=3)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, k5, iterations=2)
+    closed = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _K5_ELLIPSE, dst=teal, iterations=3)
+    mask = cv2.morphologyEx(closed, cv2.MORPH_OPEN, _K5_ELLIPSE, dst=mask, iterations=2)
 
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if not contours:
@@ -139,7 +261,8 @@ def _find_surface_roi(frame):
     # The surface has the widest rows; the skirt is narrower.
     # Use a sustained-drop approach: the surface ends where rows stay
     # below threshold for many consecutive rows (not just a net-line dip).
-    row_counts = np.sum(mask[y:y + bh, x:x + bw] > 0, axis=1)
+    # The mask is 0/255, so one fused row sum divided by 255 counts the set pixels per row
+    row_counts = cv2.reduce(mask[y:y + bh, x:x + bw], 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel() // 255
     if len(row_counts) > 30:
         peak_width = np.max(row_counts)
         # Find the main surface plateau (top-most wide rows)
@@ -170,6 +293,11 @@ def _find_surface_roi(frame):
     return (y, y + bh, x, x + bw)
 
 
+# Real pixels kept around the search zone when cropping for edge detection, so blur,
+# morphology and Canny hysteresis at the zone border see the same context as a full frame
+_EDGE_CONTEXT_PX = 32
+
+
 def _strategy_find_table_lines(frame):
     """
     Two-phase approach:
@@ -177,19 +305,18 @@ def _strategy_find_table_lines(frame):
       Phase 2: Find the actual white edge lines & net ONLY near that surface
     """
     h, w = frame.shape[:2]
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
     # --- Phase 1: Find approximate table surface region ---
-    roi = _find_surface_roi(frame)
+    hsv = _frame_hsv.get(frame)
+    roi = _find_surface_roi(frame, hsv)
     if roi is None:
         return None, None
 
     sy_top, sy_bot, sx_left, sx_right = roi
     surf_w = sx_right - sx_left
     surf_h = sy_bot - sy_top
-    print(f"    Surface ROI: x=[{sx_left},{sx_right}] y=[{sy_top},{sy_bot}]"
-          f" ({surf_w}x{surf_h})")
+    logger.debug("Surface ROI: x=[%d,%d] y=[%d,%d] (%dx%d)",
+                 sx_left, sx_right, sy_top, sy_bot, surf_w, surf_h)
 
     if surf_w < 40 or surf_h < 15:
         return None, None
@@ -203,63 +330,71 @@ def _strategy_find_table_lines(frame):
     search_x1 = max(0, sx_left - margin_x)
     search_x2 = min(w, sx_right + margin_x)
 
-    # Build edge mask restricted to the search zone
-    zone = np.zeros((h, w), dtype=np.uint8)
-    zone[search_y1:search_y2, search_x1:search_x2] = 255
+    # Build the edge mask on a crop around the search zone only, not the full frame
+    crop_y1, crop_y2 = max(0, search_y1 - _EDGE_CONTEXT_PX), min(h, search_y2 + _EDGE_CONTEXT_PX)
+    crop_x1, crop_x2 = max(0, search_x1 - _EDGE_CONTEXT_PX), min(w, search_x2 + _EDGE_CONTEXT_PX)
+    hsv_crop = hsv[crop_y1:crop_y2, crop_x1:crop_x2]
+    gray_crop = cv2.cvtColor(frame[crop_y1:crop_y2, crop_x1:crop_x2], cv2.COLOR_BGR2GRAY)
+    zone = np.zeros(hsv_crop.shape[:2], dtype=np.uint8)
+    zone[search_y1 - crop_y1:search_y2 - crop_y1, search_x1 - crop_x1:search_x2 - crop_x1] = 255
 
     # White lines on table (high brightness, low saturation)
-    white = cv2.inRange(hsv, (0, 0, 150), (180, 80, 255))
+    line_mask = cv2.inRange(hsv_crop, (0, 0, 150), (180, 80, 255))
     # Light grey (net, edge markings)
-    light = cv2.inRange(hsv, (0, 0, 110), (180, 50, 210))
-
-    line_mask = (white | light) & zone
+    cv2.bitwise_or(line_mask, cv2.inRange(hsv_crop, (0, 0, 110), (180, 50, 210)), dst=line_mask)
+    cv2.bitwise_and(line_mask, zone, dst=line_mask)
 
     # Light cleanup
-    k3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-    line_mask = cv2.morphologyEx(line_mask, cv2.MORPH_CLOSE, k3, iterations=1)
+    line_mask = cv2.morphologyEx(line_mask, cv2.MORPH_CLOSE, _K3_RECT, iterations=1)
 
     # Canny edges from grayscale (catches contrast boundaries at table edges)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    blurred = cv2.GaussianBlur(gray_crop, (5, 5), 0)
     canny = cv2.Canny(blurred, 50, 150) & zone
 
-    # Combined edges
-    combined_edges = cv2.Canny(line_mask, 30, 100) | canny
+    # Combined edges, placed back on a frame-sized canvas: HoughLinesP's rho binning and
+    # point sampling depend on the image geometry, so this keeps its segments unchanged
+    combined_edges = np.zeros((h, w), dtype=np.uint8)
+    combined_edges[crop_y1:crop_y2, crop_x1:crop_x2] = cv2.Canny(line_mask, 30, 100) | canny
 
     # --- Find line segments with Hough ---
     min_len = max(25, min(surf_w, surf_h) // 5)
     max_gap = max(15, min(surf_w, surf_h) // 8)
 
-    all_segs = []
+    # Stricter thresholds first; weaker lines are only added while fewer than 10 segments are found
+    found = []
     for thresh in [40, 25, 15]:
         segs = cv2.HoughLinesP(combined_edges, 1, np.pi / 180, thresh,
                                minLineLength=min_len, maxLineGap=max_gap)
         if segs is not None:
-            all_segs.extend(segs.reshape(-1, 4).tolist())
-        if len(all_segs) >= 10:
+            found.append(segs.reshape(-1, 4))
+        if sum(len(f) for f in found) >= 10:
             break
+    segs = np.concatenate(found) if found else np.empty((0, 4), dtype=np.int32)
 
-    if len(all_segs) < 4:
-        print("    Not enough line segments found")
+    if len(segs) < 4:
+        logger.debug("Not enough line segments found")
         return None, None
 
     # --- Classify into horizontal and near-vertical (allow perspective slant) ---
-    horizontals = []  # (y_mid, length, seg)
-    verticals = []    # (x_mid, length, seg)
-
-    for seg in all_segs:
-        x1, y1, x2, y2 = seg
-        angle = _angle_deg(float(x2 - x1), float(y2 - y1))
-        length = _seg_length(seg)
-        y_mid = (y1 + y2) / 2.0
-        x_mid = (x1 + x2) / 2.0
-
-        if angle < 25:  # horizontal
-            horizontals.append((y_mid, length, seg))
-        elif angle > 55:  # vertical / near-vertical
-            verticals.append((x_mid, length, seg))
+    all_segs = segs.tolist()
+    pts = segs.astype(np.float64)
+    dx = pts[:, 2] - pts[:, 0]
+    dy = pts[:, 3] - pts[:, 1]
+    angle = np.degrees(np.arctan2(np.abs(dy), np.abs(dx)))
+    length = np.hypot(dx, dy)
+    y_mid = (pts[:, 1] + pts[:, 3]) * 0.5
+    x_mid = (pts[:, 0] + pts[:, 2]) * 0.5
+
+    h_mask = angle < 25  # horizontal
+    v_mask = angle > 55  # vertical / near-vertical
+    # (y_mid, length, seg) and (x_mid, length, seg)
+    horizontals = list(zip(y_mid[h_mask].tolist(), length[h_mask].tolist(),
+                           [seg for seg, keep in zip(all_segs, h_mask.tolist()) if keep]))
+    verticals = list(zip(x_mid[v_mask].tolist(), length[v_mask].tolist(),
+                         [seg for seg, keep in zip(all_segs, v_mask.tolist()) if keep]))
 
     if len(horizontals) < 2:
-        print("    Not enough horizontal lines")
+        logger.debug("Not enough horizontal lines")
         return None, None
 
     # --- Group by position (cluster nearby segments) ---
@@ -296,7 +431,7 @@ def _strategy_find_table_lines(frame):
             bot_line = grp
 
     if top_line is None or bot_line is None:
-        print("    Could not find top/bottom edge lines")
+        logger.debug("Could not find top/bottom edge lines")
         return None, None
 
     # Find left and right vertical lines closest to surface edges
@@ -329,7 +464,7 @@ def _strategy_find_table_lines(frame):
         # Fall back to surface edges if vertical lines not found
         left_x = float(sx_left)
         right_x = float(sx_right)
-        print("    Using surface edges for left/right (vertical lines weak)")
+        logger.debug("Using surface edges for left/right (vertical lines weak)")
 
     # Try intersection-based corners for perspective accuracy
     top_seg = max(top_line[2], key=lambda s: _seg_length(s))
@@ -366,7 +501,7 @@ def _strategy_find_table_lines(frame):
         ], dtype=np.float32)
 
     if not _valid_table(corners, h, w, aspect_range=(1.3, 5.5)):
-        print("    Lines found but rectangle invalid")
+        logger.debug("Lines found but rectangle invalid")
         return None, None
 
     # --- Find the net ---
@@ -379,29 +514,26 @@ def _strategy_find_table_lines(frame):
             net_y = int(ny)
             break
 
-    tw = np.linalg.norm(corners[1] - corners[0])
-    th_t = np.linalg.norm(corners[3] - corners[0])
-    msg = f"  [Strategy 0: surface+lines] Table {tw:.0f}x{th_t:.0f}"
-    if net_y:
-        msg += f", net at y={net_y}"
-    print(msg)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Strategy 0: surface+lines] Table %.0fx%.0f%s",
+                     _corner_dist(corners, 1, 0), _corner_dist(corners, 3, 0),
+                     f", net at y={net_y}" if net_y else "")
     return corners, net_y
 
 
 def _group_lines(items, merge_dist):
-    """Group line segments by position (first element of tuple). Returns list of [avg_pos, total_length, [segs]]."""
+    """Group line segments by position (first element of tuple). Returns list of [avg_pos, total_length, [segs]].
+    Each segment joins the first earlier group within merge_dist, so grouping follows Hough's segment order."""
     groups = []
     for pos, length, seg in items:
-        merged = False
         for grp in groups:
             if abs(pos - grp[0]) < merge_dist:
                 n = len(grp[2])
                 grp[0] = (grp[0] * n + pos) / (n + 1)
                 grp[1] += length
                 grp[2].append(seg)
-                merged = True
                 break
-        if not merged:
+        else:
             groups.append([pos, length, [seg]])
     return groups
 
@@ -410,82 +542,155 @@ def _group_lines(items, merge_dist):
 # DENSE-BLOCK X-EXTENT FINDER
 # ============================================================
 
-def _find_dense_extent(col_counts, min_px=2, max_gap=30):
-    """Find the longest contiguous block of occupied columns, ignoring scattered noise."""
-    occupied = col_counts >= min_px
-    runs = []
-    run_start = None
-    run_end = 0
+@njit(cache=True)
+def _dense_extent_kernel(col_counts, min_px, max_gap):
+    """Longest run of columns with >= min_px pixels, bridging gaps of up to max_gap; (-1, -1) if none."""
+    best_start, best_end = -1, -1
+    run_start, run_end = -1, 0
     gap_count = 0
-    for x in range(len(col_counts)):
-        if occupied[x]:
-            if run_start is None:
+    for x in range(col_counts.shape[0]):
+        if col_counts[x] >= min_px:
+            if run_start < 0:
                 run_start = x
             gap_count = 0
             run_end = x
         else:
             gap_count += 1
-            if run_start is not None and gap_count > max_gap:
-                runs.append((run_start, run_end))
-                run_start = None
-    if run_start is not None:
-        runs.append((run_start, run_end))
-    if not runs:
+            if run_start >= 0 and gap_count > max_gap:
+                if best_start < 0 or run_end - run_start > best_end - best_start:
+                    best_start, best_end = run_start, run_end
+                run_start = -1
+    if run_start >= 0 and (best_start < 0 or run_end - run_start > best_end - best_start):
+        best_start, best_end = run_start, run_end
+    return best_start, best_end
+
+
+def _dense_extent_numpy(col_counts, min_px, max_gap):
+    """Vectorized _dense_extent_kernel, for when Numba is not installed."""
+    edges = np.diff((col_counts >= min_px).view(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    if len(starts) == 0:
+        return -1, -1
+    ends = np.flatnonzero(edges == -1) - 1
+    # A run joins the previous one unless more than max_gap empty columns separate them
+    new_block = np.empty(len(starts), dtype=bool)
+    new_block[0] = True
+    new_block[1:] = starts[1:] - ends[:-1] - 1 > max_gap
+    block_starts = starts[new_block]
+    block_ends = ends[np.append(new_block[1:], True)]
+    i = int(np.argmax(block_ends - block_starts))
+    return int(block_starts[i]), int(block_ends[i])
+
+
+_dense_extent = _dense_extent_kernel if NUMBA_AVAILABLE else _dense_extent_numpy
+
+
+def _find_dense_extent(col_counts, min_px=2, max_gap=30):
+    """Find the longest contiguous block of occupied columns, ignoring scattered noise."""
+    xl, xr = _dense_extent(np.ascontiguousarray(col_counts), min_px, max_gap)
+    if xl < 0:
         return None, None
-    longest = max(runs, key=lambda r: r[1] - r[0])
-    return longest[0], longest[1]
+    return xl, xr
+
+
+if NUMBA_AVAILABLE:
+    # Compile for the column-count dtype (integral-image rows) up front, not on the first frame
+    _dense_extent_kernel(np.zeros(16, dtype=np.int32), 2, 30)
 
 
 # ============================================================
 # PEAK-BASED BAND DETECTION
 # ============================================================
 
-def _add_band(mask, row_smooth, band_start, band_end, w, h_bands):
-    peak_val = float(np.max(row_smooth[band_start:band_end + 1]))
+# Band fields, stored column-wise (one array per field) by _find_h_bands
+_BAND_FIELDS = (('center', np.int64), ('peak', np.float64), ('start', np.int64), ('end', np.int64),
+                ('xl', np.int64), ('xr', np.int64), ('xspan', np.int64))
+
+
+def _band_record(integral, row_smooth, band_start, band_end):
+    """_BAND_FIELDS tuple for rows band_start..band_end, or None if it has no dense x-extent."""
     center = band_start + int(np.argmax(row_smooth[band_start:band_end + 1]))
-    band_rows = mask[band_start:band_end + 1, :]
-    band_col = np.sum(band_rows > 0, axis=0)
+    peak_val = float(row_smooth[center])
+    # Per-column pixel count over the band's rows, read off the mask's integral image
+    band_col = np.diff(integral[band_end + 1] - integral[band_start])
     band_thick = band_end - band_start + 1
     min_px = max(2, band_thick // 3)
     xl, xr = _find_dense_extent(band_col, min_px=min_px, max_gap=30)
-    if xl is not None and xr is not None:
-        h_bands.append({
-            'center': center, 'peak': peak_val,
-            'start': band_start, 'end': band_end,
-            'xl': xl, 'xr': xr, 'xspan': xr - xl,
-        })
+    if xl is None or xr is None:
+        return None
+    return center, peak_val, band_start, band_end, xl, xr, xr - xl
 
 
-def _find_h_bands(mask, row_smooth, above, w, h):
-    h_bands = []
+@njit(cache=True)
+def _band_runs_kernel(above):
+    """Start and (inclusive) end index of every run of True in `above`."""
+    n = above.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    ends = np.empty(n, dtype=np.int64)
+    count = 0
     in_band = False
     band_start = 0
-    for y in range(h):
+    for y in range(n):
         if above[y] and not in_band:
             band_start = y
             in_band = True
         elif not above[y] and in_band:
-            _add_band(mask, row_smooth, band_start, y - 1, w, h_bands)
+            starts[count] = band_start
+            ends[count] = y - 1
+            count += 1
             in_band = False
     if in_band:
-        _add_band(mask, row_smooth, band_start, h - 1, w, h_bands)
-    return h_bands
-
-
-def _best_band_pair(h_bands, min_peak_sep, row_max, frame_h, frame_w):
-    best = None
-    best_score = -1
-    for i in range(len(h_bands)):
-        for j in range(i + 1, len(h_bands)):
-            bi, bj = h_bands[i], h_bands[j]
-            top_b = bi if bi['center'] < bj['center'] else bj
-            bot_b = bj if bi['center'] < bj['center'] else bi
-            top_y = top_b['center']
-            bot_y = bot_b['center']
+        starts[count] = band_start
+        ends[count] = n - 1
+        count += 1
+    return starts[:count], ends[:count]
+
+
+def _band_runs_numpy(above):
+    """_band_runs_kernel from the rising/falling edges of the zero-padded mask."""
+    edges = np.diff(np.concatenate(([0], above.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+_band_runs = _band_runs_kernel if NUMBA_AVAILABLE else _band_runs_numpy
+
+
+def _find_h_bands(integral, row_smooth, above, band_cache=None):
+    """Bands of consecutive `above` rows with a dense x-extent, as a dict of per-field arrays.
+    `above` is a contiguous bool array with one entry per mask row. `band_cache` maps
+    (start, end) to an earlier _band_record, so a band that comes out the same at several
+    thresholds of one scan is measured once."""
+    starts, ends = _band_runs(above)
+    if band_cache is None:
+        band_cache = {}
+    rows = []
+    for key in zip(starts.tolist(), ends.tolist()):
+        if key not in band_cache:
+            band_cache[key] = _band_record(integral, row_smooth, *key)
+        if band_cache[key] is not None:
+            rows.append(band_cache[key])
+    columns = zip(*rows) if rows else [()] * len(_BAND_FIELDS)
+    return {name: np.array(col, dtype=dtype) for (name, dtype), col in zip(_BAND_FIELDS, columns)}
+
+
+@njit(cache=True)
+def _best_band_pair_kernel(center, peak, xl, xr, xspan, min_peak_sep, row_max, frame_h, frame_w):
+    """Score every band pair (i < j); best (top_y, bot_y, left, right), or all -1 if no pair qualifies."""
+    best_score = -1.0
+    best = (-1, -1, -1, -1)
+    n = center.shape[0]
+    for i in range(n):
+        for j in range(i + 1, n):
+            if center[i] < center[j]:
+                t, b = i, j
+            else:
+                t, b = j, i
+            top_y = center[t]
+            bot_y = center[b]
             if bot_y - top_y < min_peak_sep:
                 continue
-            left = min(top_b['xl'], bot_b['xl'])
-            right = max(top_b['xr'], bot_b['xr'])
+            left = min(xl[t], xl[b])
+            right = max(xr[t], xr[b])
             tw = right - left
             th = bot_y - top_y
             if tw < 30 or th < 15:
@@ -497,19 +702,18 @@ def _best_band_pair(h_bands, min_peak_sep, row_max, frame_h, frame_w):
                 continue
             if frame_h > 0 and th > frame_h * 0.40:
                 continue
-            top_span = top_b['xspan']
-            bot_span = bot_b['xspan']
+            top_span = xspan[t]
+            bot_span = xspan[b]
             span_sim = min(top_span, bot_span) / (max(top_span, bot_span) + 1)
-            overlap_left = max(top_b['xl'], bot_b['xl'])
-            overlap_right = min(top_b['xr'], bot_b['xr'])
+            overlap_left = max(xl[t], xl[b])
+            overlap_right = min(xr[t], xr[b])
             if overlap_right > overlap_left:
-                overlap = overlap_right - overlap_left
-                overlap_ratio = overlap / (max(top_span, bot_span) + 1)
+                overlap_ratio = (overlap_right - overlap_left) / (max(top_span, bot_span) + 1)
             else:
-                overlap_ratio = 0
+                overlap_ratio = 0.0
             cy = (top_y + bot_y) / 2
-            pos_score = max(0, 1.0 - abs(cy - frame_h * 0.45) / (frame_h * 0.5))
-            strength = (top_b['peak'] + bot_b['peak']) / (2 * row_max + 1)
+            pos_score = max(0.0, 1.0 - abs(cy - frame_h * 0.45) / (frame_h * 0.5))
+            strength = (peak[t] + peak[b]) / (2 * row_max + 1)
             score = (span_sim * 0.35 + overlap_ratio * 0.25 +
                      pos_score * 0.20 + strength * 0.20)
             if score > best_score:
@@ -518,12 +722,93 @@ def _best_band_pair(h_bands, min_peak_sep, row_max, frame_h, frame_w):
     return best
 
 
-def _peak_border_scan(mask, min_peak_height=80, min_peak_sep=20):
-    """Find table borders via horizontal band detection + pair scoring."""
+def _best_band_pair_numpy(center, peak, xl, xr, xspan, min_peak_sep, row_max, frame_h, frame_w):
+    """_best_band_pair_kernel with all pairs scored at once, for when Numba is not installed."""
+    # Pairs in loop order (i < j); t/b index the upper and lower band of each pair
+    i, j = np.triu_indices(len(center), 1)
+    i_top = center[i] < center[j]
+    t = np.where(i_top, i, j)
+    b = np.where(i_top, j, i)
+    top_y, bot_y = center[t], center[b]
+    left = np.minimum(xl[t], xl[b])
+    right = np.maximum(xr[t], xr[b])
+    tw = right - left
+    th = bot_y - top_y
+    aspect = tw / (th + 1e-6)
+    valid = ((th >= min_peak_sep) & (tw >= 30) & (th >= 15)
+             & (aspect >= 1.4) & (aspect <= 5.0))
+    if frame_w > 0:
+        valid &= tw <= frame_w * 0.50
+    if frame_h > 0:
+        valid &= th <= frame_h * 0.40
+    cand = np.flatnonzero(valid)
+    if len(cand) == 0:
+        return -1, -1, -1, -1
+
+    # Score only the pairs that passed the geometry checks, still in loop order
+    t, b = t[cand], b[cand]
+    top_y, bot_y, left, right = top_y[cand], bot_y[cand], left[cand], right[cand]
+    top_span, bot_span = xspan[t], xspan[b]
+    span_sim = np.minimum(top_span, bot_span) / (np.maximum(top_span, bot_span) + 1)
+    overlap = np.minimum(xr[t], xr[b]) - np.maximum(xl[t], xl[b])
+    overlap_ratio = np.where(overlap > 0, overlap / (np.maximum(top_span, bot_span) + 1), 0)
+    cy = (top_y + bot_y) / 2
+    pos_score = np.maximum(0, 1.0 - np.abs(cy - frame_h * 0.45) / (frame_h * 0.5))
+    strength = (peak[t] + peak[b]) / (2 * row_max + 1)
+    score = (span_sim * 0.35 + overlap_ratio * 0.25 +
+             pos_score * 0.20 + strength * 0.20)
+
+    # First maximum in loop order, as the pairwise loop picked it
+    k = int(np.argmax(score))
+    return (int(top_y[k]), int(bot_y[k]), int(left[k]), int(right[k]))
+
+
+_score_band_pairs = _best_band_pair_kernel if NUMBA_AVAILABLE else _best_band_pair_numpy
+
+
+def _best_band_pair(h_bands, min_peak_sep, row_max, frame_h, frame_w):
+    """Best-scoring (top_y, bot_y, left, right) over all band pairs, or None."""
+    if len(h_bands['center']) < 2:
+        return None
+    top_y, bot_y, left, right = _score_band_pairs(
+        h_bands['center'], h_bands['peak'], h_bands['xl'], h_bands['xr'], h_bands['xspan'],
+        int(min_peak_sep), float(row_max), int(frame_h), int(frame_w))
+    if top_y < 0:
+        return None
+    return int(top_y), int(bot_y), int(left), int(right)
+
+
+if NUMBA_AVAILABLE:
+    _band_runs_kernel(np.zeros(4, dtype=bool))
+    _ints = np.zeros(2, dtype=np.int64)
+    _best_band_pair_kernel(_ints, np.zeros(2), _ints, _ints, _ints, 20, 1.0, 720, 1280)
+    del _ints
+
+
+# 5-row box filter for the row-count profile
+_ROW_SMOOTH_KERNEL = np.ones(5) / 5.0
+
+
+def _occupancy_integral(mask):
+    """cv2.integral of the mask's nonzero pixels (int32, shape (h + 1, w + 1))."""
+    return cv2.integral((mask > 0).view(np.uint8))
+
+
+def _peak_border_scan(mask, min_peak_height=80, min_peak_sep=20, integral=None):
+    """Find table borders via horizontal band detection + pair scoring.
+    Pass the mask's `integral` (_occupancy_integral) when the caller already has it.
+
+    Runs at the mask's own resolution: besides the two arguments, the band gap bridging
+    (max_gap=30) and the minimum pair size (30 x 15 px) are pixel sizes tuned on ~720p,
+    and the whole scan costs well under a millisecond there.
+    """
     h, w = mask.shape[:2]
-    row_counts = np.sum(mask > 0, axis=1).astype(np.float64)
-    kernel = np.ones(5) / 5.0
-    row_smooth = np.convolve(row_counts, kernel, mode='same')
+    # Integral image of the occupied pixels: the last column gives the row counts, and any
+    # band's column histogram is one row subtraction instead of a re-scan on every threshold
+    if integral is None:
+        integral = _occupancy_integral(mask)
+    row_counts = np.diff(integral[:, -1]).astype(np.float64)
+    row_smooth = np.convolve(row_counts, _ROW_SMOOTH_KERNEL, mode='same')
     row_max = np.max(row_smooth)
     if row_max < min_peak_height:
         return None
@@ -532,12 +817,15 @@ def _peak_border_scan(mask, min_peak_height=80, min_peak_sep=20):
         row_max * 0.7, row_max * 0.5, row_max * 0.3,
         row_max * 0.2, float(min_peak_height),
     ]), reverse=True)
+    # One row mask, refilled in place for each threshold, and the bands measured so far
+    above = np.empty(h, dtype=bool)
+    band_cache = {}
     for row_thresh in thresholds:
         if row_thresh < min_peak_height:
             continue
-        above = row_smooth >= row_thresh
-        h_bands = _find_h_bands(mask, row_smooth, above, w, h)
-        if len(h_bands) < 2:
+        np.greater_equal(row_smooth, row_thresh, out=above)
+        h_bands = _find_h_bands(integral, row_smooth, above, band_cache)
+        if len(h_bands['center']) < 2:
             continue
         result = _best_band_pair(h_bands, min_peak_sep, row_max, h, w)
         if result is not None:
@@ -549,77 +837,98 @@ def _peak_border_scan(mask, min_peak_height=80, min_peak_sep=20):
 # HOUGH REFINEMENT
 # ============================================================
 
-def _refine_edge_hough(mask, pos, direction, margin, w, h):
+def _hough_first_hit(band, min_len, max_gap):
+    """Segments from the strictest of the Hough thresholds 20, 12, 8 that finds any, else None.
+    The stricter calls are cheap and nearly always hit; a single threshold-8 call returns a
+    different segment set, so the retry order is kept."""
+    for thresh in (20, 12, 8):
+        segs = cv2.HoughLinesP(band, 1, np.pi / 180, thresh,
+                               minLineLength=min_len, maxLineGap=max_gap)
+        if segs is not None and len(segs) > 0:
+            return segs
+    return None
+
+
+def _refine_edge_hough(mask, pos, direction, margin, w, h, zone=None):
+    """Longest near-horizontal/vertical segment within `margin` of `pos`.
+
+    With `zone` = (y1, y2, x1, x2) only mask pixels inside that box are searched: the band is
+    cleared outside it on a copy, so callers never build a zoned copy of the whole frame.
+    """
     if direction == 'horizontal':
         y1b = max(0, pos - margin)
         y2b = min(h, pos + margin + 1)
         band = mask[y1b:y2b, :]
-        if band.sum() == 0:
+        if zone is not None:
+            # Count on the zone-clipped view first, so empty bands are never copied
+            if cv2.countNonZero(mask[max(y1b, zone[0]):min(y2b, zone[1]), zone[2]:zone[3]]) == 0:
+                return None
+            band = band.copy()
+            _clear_outside(band, max(0, zone[0] - y1b), max(0, zone[1] - y1b), zone[2], zone[3])
+        elif cv2.countNonZero(band) == 0:
             return None
         min_len = max(15, w // 25)
         max_gap = max(20, w // 10)
-        for thresh in (20, 12, 8):
-            segs = cv2.HoughLinesP(band, 1, np.pi / 180, thresh,
-                                   minLineLength=min_len, maxLineGap=max_gap)
-            if segs is not None and len(segs) > 0:
-                break
-        if segs is None or len(segs) == 0:
+        segs = _hough_first_hit(band, min_len, max_gap)
+        if segs is None:
             return None
-        best = None
-        best_len = 0
-        for seg in segs.reshape(-1, 4):
-            x1, y1s, x2, y2s = seg
-            angle = _angle_deg(float(x2 - x1), float(y2s - y1s))
-            length = _seg_length(seg)
-            if angle < 25 and length > best_len:
-                best_len = length
-                best = ((float(x1), float(y1s + y1b)),
-                        (float(x2), float(y2s + y1b)))
-        return best
+        segs = segs.reshape(-1, 4)
+        angle, length = _seg_angle_length(segs)
+        k = _longest(length, (angle < 25) & (length > 0))
+        if k < 0:
+            return None
+        x1, y1s, x2, y2s = segs[k].tolist()
+        return ((float(x1), float(y1s + y1b)),
+                (float(x2), float(y2s + y1b)))
     else:
         x1b = max(0, pos - margin)
         x2b = min(w, pos + margin + 1)
         band = mask[:, x1b:x2b]
-        if band.sum() == 0:
+        if zone is not None:
+            if cv2.countNonZero(mask[zone[0]:zone[1], max(x1b, zone[2]):min(x2b, zone[3])]) == 0:
+                return None
+            band = band.copy()
+            _clear_outside(band, zone[0], zone[1], max(0, zone[2] - x1b), max(0, zone[3] - x1b))
+        elif cv2.countNonZero(band) == 0:
             return None
         min_len = max(15, h // 25)
         max_gap = max(20, h // 10)
-        for thresh in (20, 12, 8):
-            segs = cv2.HoughLinesP(band, 1, np.pi / 180, thresh,
-                                   minLineLength=min_len, maxLineGap=max_gap)
-            if segs is not None and len(segs) > 0:
-                break
-        if segs is None or len(segs) == 0:
+        segs = _hough_first_hit(band, min_len, max_gap)
+        if segs is None:
             return None
-        best = None
-        best_len = 0
-        for seg in segs.reshape(-1, 4):
-            x1s, y1s, x2s, y2s = seg
-            angle = _angle_deg(float(x2s - x1s), float(y2s - y1s))
-            length = _seg_length(seg)
-            if angle > 65 and length > best_len:
-                best_len = length
-                best = ((float(x1s + x1b), float(y1s)),
-                        (float(x2s + x1b), float(y2s)))
-        return best
+        segs = segs.reshape(-1, 4)
+        angle, length = _seg_angle_length(segs)
+        k = _longest(length, (angle > 65) & (length > 0))
+        if k < 0:
+            return None
+        x1s, y1s, x2s, y2s = segs[k].tolist()
+        return ((float(x1s + x1b), float(y1s)),
+                (float(x2s + x1b), float(y2s)))
+
+
+# HoughLinesP releases the GIL, so the four edge searches of a refine can run side by side;
+# on a single core they stay serial
+_REFINE_WORKERS = min(4, os.cpu_count() or 1)
+_REFINE_POOL = ThreadPoolExecutor(max_workers=_REFINE_WORKERS) if _REFINE_WORKERS > 1 else None
 
 
 def _try_hough_refine(mask, top, bot, left, right, h, w):
     margin = max(15, min(w, h) // 50)
     refine_pad = margin * 3
-    mask_refine = mask.copy()
-    rzone = np.zeros_like(mask_refine)
     ry1 = max(0, top - refine_pad)
     ry2 = min(h, bot + refine_pad)
     rx1 = max(0, left - refine_pad)
     rx2 = min(w, right + refine_pad)
-    rzone[ry1:ry2, rx1:rx2] = 255
-    mask_refine = mask_refine & rzone
+    zone = (ry1, ry2, rx1, rx2)
 
-    top_line = _refine_edge_hough(mask_refine, top, 'horizontal', margin, w, h)
-    bot_line = _refine_edge_hough(mask_refine, bot, 'horizontal', margin, w, h)
-    left_line = _refine_edge_hough(mask_refine, left, 'vertical', margin, w, h)
-    right_line = _refine_edge_hough(mask_refine, right, 'vertical', margin, w, h)
+    edges = ((top, 'horizontal'), (bot, 'horizontal'), (left, 'vertical'), (right, 'vertical'))
+    if _REFINE_POOL is not None:
+        futures = [_REFINE_POOL.submit(_refine_edge_hough, mask, pos, direction, margin, w, h, zone)
+                   for pos, direction in edges]
+        top_line, bot_line, left_line, right_line = [f.result() for f in futures]
+    else:
+        top_line, bot_line, left_line, right_line = [
+            _refine_edge_hough(mask, pos, direction, margin, w, h, zone) for pos, direction in edges]
 
     if all(l is not None for l in [top_line, bot_line, left_line, right_line]):
         tl = _line_intersection(top_line[0], top_line[1], left_line[0], left_line[1])
@@ -635,58 +944,174 @@ def _try_hough_refine(mask, top, bot, left, right, h, w):
 # MASKS
 # ============================================================
 
-def _build_pink_mask(frame):
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+def _build_pink_mask(frame, hsv=None):
+    if hsv is None:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
     pink = cv2.inRange(hsv, (130, 50, 30), (175, 255, 255))
-    red = cv2.inRange(hsv, (0, 50, 30), (12, 255, 255))
-    return pink | red
+    red = cv2.inRange(hsv, (0, 50, 30), (12, 255, 255), dst=_scratch.get('pink_tmp', pink.shape))
+    return cv2.bitwise_or(pink, red, dst=pink)
 
 
-def _build_color_mask(frame):
+# HSV boxes for the line colours: pink, red, white, yellow, cyan (lo H, S, V, hi H, S, V)
+_LINE_COLOR_RANGES = np.array([
+    (130, 50, 30, 175, 255, 255),
+    (0, 50, 30, 12, 255, 255),
+    (0, 0, 180, 180, 50, 255),
+    (15, 40, 150, 35, 255, 255),
+    (80, 40, 150, 100, 255, 255),
+], dtype=np.uint8)
+
+
+@njit(cache=True)
+def _color_mask_kernel(hsv, ranges):
+    """Single pass over the HSV image: 255 where a pixel falls in any of the colour boxes."""
+    h, w = hsv.shape[:2]
+    out = np.zeros((h, w), dtype=np.uint8)
+    for y in range(h):
+        for x in range(w):
+            hh = hsv[y, x, 0]
+            ss = hsv[y, x, 1]
+            vv = hsv[y, x, 2]
+            for r in range(ranges.shape[0]):
+                if (ranges[r, 0] <= hh <= ranges[r, 3] and ranges[r, 1] <= ss <= ranges[r, 4]
+                        and ranges[r, 2] <= vv <= ranges[r, 5]):
+                    out[y, x] = 255
+                    break
+    return out
+
+
+def _color_mask_numpy(hsv, ranges):
+    mask = cv2.inRange(hsv, ranges[0, :3], ranges[0, 3:])
+    tmp = _scratch.get('color_tmp', mask.shape)
+    for r in ranges[1:]:
+        cv2.bitwise_or(mask, cv2.inRange(hsv, r[:3], r[3:], dst=tmp), dst=mask)
+    return mask
+
+
+_color_mask = _color_mask_kernel if NUMBA_AVAILABLE else _color_mask_numpy
+
+if NUMBA_AVAILABLE:
+    _color_mask_kernel(np.zeros((2, 2, 3), dtype=np.uint8), _LINE_COLOR_RANGES)
+
+
+def _build_color_mask(frame, hsv=None):
+    if hsv is None:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    return _color_mask(hsv, _LINE_COLOR_RANGES)
+
+
+class _GpuBorderMasks(threading.local):
+    """CUDA version of the strategy-1 masks: one upload, cvtColor/inRange/morphology on the
+    device, and only the two cleaned masks downloaded. Filters are built per thread on first use."""
+
+    def __init__(self):
+        self._filters = None
+
+    def _get_filters(self):
+        if self._filters is None:
+            make = cv2.cuda.createMorphologyFilter
+            self._filters = (
+                make(cv2.MORPH_CLOSE, cv2.CV_8UC1, _K3_RECT, iterations=1),
+                make(cv2.MORPH_CLOSE, cv2.CV_8UC1, _K3_RECT, iterations=2),
+                make(cv2.MORPH_OPEN, cv2.CV_8UC1, _K3_RECT, iterations=1),
+            )
+        return self._filters
+
+    def __call__(self, frame):
+        pink_close, color_close, color_open = self._get_filters()
+        gpu_frame = cv2.cuda_GpuMat()
+        gpu_frame.upload(frame)
+        hsv = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGR2HSV)
+        ranges = [cv2.cuda.inRange(hsv, tuple(int(v) for v in r[:3]), tuple(int(v) for v in r[3:]))
+                  for r in _LINE_COLOR_RANGES]
+        # The first two boxes (pink, red) make up the pink mask
+        pink = cv2.cuda.bitwise_or(ranges[0], ranges[1])
+        color = pink
+        for extra in ranges[2:]:
+            color = cv2.cuda.bitwise_or(color, extra)
+        pink_clean = pink_close.apply(pink)
+        color_clean = color_open.apply(color_close.apply(color))
+        return pink_clean.download(), color_clean.download()
+
+
+def _cpu_border_masks(frame):
     hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    pink = cv2.inRange(hsv, (130, 50, 30), (175, 255, 255))
-    red = cv2.inRange(hsv, (0, 50, 30), (12, 255, 255))
-    white = cv2.inRange(hsv, (0, 0, 180), (180, 50, 255))
-    yellow = cv2.inRange(hsv, (15, 40, 150), (35, 255, 255))
-    cyan = cv2.inRange(hsv, (80, 40, 150), (100, 255, 255))
-    return pink | red | white | yellow | cyan
-
-
-def _apply_zone(mask, h, w, y_frac, x_frac):
-    y1 = int(h * y_frac[0])
-    y2 = int(h * y_frac[1])
-    x1 = int(w * x_frac[0])
-    x2 = int(w * x_frac[1])
-    zone = np.zeros_like(mask)
-    zone[y1:y2, x1:x2] = 255
-    return cv2.bitwise_and(mask, zone), (y1, y2, x1, x2)
-
-
-def _profile_scan(mask, y1z, y2z, x1z, x2z, row_thresh_pct=0.08, col_thresh_pct=0.04):
-    h_full, w_full = mask.shape[:2]
-    row_counts = np.sum(mask > 0, axis=1)
-    col_counts = np.sum(mask > 0, axis=0)
+    pink_clean = cv2.morphologyEx(_build_pink_mask(frame, hsv), cv2.MORPH_CLOSE, _K3_RECT, iterations=1)
+    color_clean = cv2.morphologyEx(_build_color_mask(frame, hsv), cv2.MORPH_CLOSE, _K3_RECT, iterations=2)
+    color_clean = cv2.morphologyEx(color_clean, cv2.MORPH_OPEN, _K3_RECT, iterations=1)
+    return pink_clean, color_clean
+
+
+_gpu_border_masks = _GpuBorderMasks() if CUDA_AVAILABLE else None
+_gpu_masks_verified = False
+# Serializes the first-frame check and switching the GPU path off, across detector threads
+_gpu_masks_lock = threading.Lock()
+
+
+def _gpu_masks_match(gpu_masks, frame):
+    """True if `gpu_masks` builds the same masks as the CPU path on `frame`; logs the first mismatch."""
+    try:
+        masks = gpu_masks(frame)
+    except cv2.error as exc:
+        logger.warning("CUDA border masks failed (%s) on the check frame.", exc)
+        return False
+    for name, gpu, cpu in zip(('pink', 'color'), masks, _cpu_border_masks(frame)):
+        if not np.array_equal(gpu, cpu):
+            logger.warning("CUDA %s mask differs from the CPU mask in %d pixels.",
+                           name, int(np.count_nonzero(gpu != cpu)))
+            return False
+    return True
+
+
+def _border_masks_gpu(frame):
+    """GPU masks for strategy 1, or None to build them on the CPU. The first frame is built
+    both ways (once, under a lock); any pixel difference turns the GPU path off for the process."""
+    global _gpu_border_masks, _gpu_masks_verified
+    if not _gpu_masks_verified:
+        with _gpu_masks_lock:
+            if not _gpu_masks_verified and _gpu_border_masks is not None:
+                if _gpu_masks_match(_gpu_border_masks, frame):
+                    _gpu_masks_verified = True
+                else:
+                    logger.warning("Using the CPU path for the border masks.")
+                    _gpu_border_masks = None
+    # Read once: another thread may switch the path off while this call runs
+    gpu_masks = _gpu_border_masks
+    if gpu_masks is None:
+        return None
+    try:
+        return gpu_masks(frame)
+    except cv2.error as exc:
+        with _gpu_masks_lock:
+            if _gpu_border_masks is gpu_masks:
+                logger.warning("CUDA border masks failed (%s); using the CPU path.", exc)
+                _gpu_border_masks = None
+        return None
+
+
+def _profile_scan(integral, y1z, y2z, x1z, x2z, row_thresh_pct=0.08, col_thresh_pct=0.04):
+    """Tightest box of rows/columns inside the zone that clear their pixel-count thresholds.
+
+    `integral` is cv2.integral of the occupied mask; the zone's row and column counts are
+    read off it with two subtractions, so no zoned copy of the mask is built or re-summed.
+    """
+    h_full, w_full = integral.shape[0] - 1, integral.shape[1] - 1
+    row_counts = np.diff(integral[y1z:y2z + 1, x2z] - integral[y1z:y2z + 1, x1z])
+    col_counts = np.diff(integral[y2z, x1z:x2z + 1] - integral[y1z, x1z:x2z + 1])
     zone_w = x2z - x1z
     zone_h = y2z - y1z
     min_row_px = max(5, zone_w * row_thresh_pct)
     min_col_px = max(3, zone_h * col_thresh_pct)
 
-    top = bot = left = right = None
-    for y in range(y1z, y2z):
-        if row_counts[y] >= min_row_px:
-            top = y; break
-    for y in range(y2z - 1, y1z - 1, -1):
-        if row_counts[y] >= min_row_px:
-            bot = y; break
-    for x in range(x1z, x2z):
-        if col_counts[x] >= min_col_px:
-            left = x; break
-    for x in range(x2z - 1, x1z - 1, -1):
-        if col_counts[x] >= min_col_px:
-            right = x; break
-
-    if any(v is None for v in [top, bot, left, right]):
+    # First and last row / column inside the zone that clears its threshold
+    rmask = row_counts >= min_row_px
+    cmask = col_counts >= min_col_px
+    if not (rmask.any() and cmask.any()):
         return None
+    top = y1z + int(np.argmax(rmask))
+    bot = y1z + len(rmask) - 1 - int(np.argmax(rmask[::-1]))
+    left = x1z + int(np.argmax(cmask))
+    right = x1z + len(cmask) - 1 - int(np.argmax(cmask[::-1]))
     tw = right - left
     th = bot - top
     if tw < 40 or th < 20:
@@ -705,45 +1130,54 @@ def _profile_scan(mask, y1z, y2z, x1z, x2z, row_thresh_pct=0.08, col_thresh_pct=
 # STRATEGY 1: Peak + Profile + Hough (MOST RELIABLE)
 # ============================================================
 
-def _strategy_border_lines(frame):
+def _strategy_border_lines(frame, hsv=None):
     h, w = frame.shape[:2]
-    k3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+    masks = _border_masks_gpu(frame)
+    if masks is not None:
+        pink_clean, color_clean = masks
+    else:
+        pink_clean = color_clean = None
+        if hsv is None:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
 
     # Pass 1: Pink-only peak detection
-    pink_mask = _build_pink_mask(frame)
-    pink_clean = cv2.morphologyEx(pink_mask, cv2.MORPH_CLOSE, k3, iterations=1)
+    if pink_clean is None:
+        pink_mask = _build_pink_mask(frame, hsv)
+        pink_clean = cv2.morphologyEx(pink_mask, cv2.MORPH_CLOSE, _K3_RECT, iterations=1)
 
     edges_approx = _peak_border_scan(pink_clean, min_peak_height=80)
     if edges_approx is not None:
         top, bot, left, right = edges_approx
         corners = _try_hough_refine(pink_clean, top, bot, left, right, h, w)
         if corners is not None and _valid_table(corners, h, w):
-            tw_c = np.linalg.norm(corners[1] - corners[0])
-            th_c = np.linalg.norm(corners[3] - corners[0])
-            print(f"  [Strategy 1: Pink peak+Hough] {tw_c:.0f}x{th_c:.0f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Strategy 1: Pink peak+Hough] %.0fx%.0f", _corner_dist(corners, 1, 0), _corner_dist(corners, 3, 0))
             return corners
         corners = np.array([[left, top], [right, top], [right, bot], [left, bot]], dtype=np.float32)
         if _valid_table(corners, h, w):
-            print(f"  [Strategy 1: Pink peak scan] {right - left}x{bot - top}")
+            logger.debug("[Strategy 1: Pink peak scan] %dx%d", right - left, bot - top)
             return corners
 
     # Pass 2: All-color peak detection
-    color_mask = _build_color_mask(frame)
-    color_clean = cv2.morphologyEx(color_mask, cv2.MORPH_CLOSE, k3, iterations=2)
-    color_clean = cv2.morphologyEx(color_clean, cv2.MORPH_OPEN, k3, iterations=1)
-
-    edges_approx = _peak_border_scan(color_clean, min_peak_height=60)
+    if color_clean is None:
+        color_mask = _build_color_mask(frame, hsv)
+        color_clean = cv2.morphologyEx(color_mask, cv2.MORPH_CLOSE, _K3_RECT, iterations=2)
+        color_clean = cv2.morphologyEx(color_clean, cv2.MORPH_OPEN, _K3_RECT, iterations=1)
+
+    # Shared by the peak scan and the zone profile scan below
+    color_integral = _occupancy_integral(color_clean)
+    edges_approx = _peak_border_scan(color_clean, min_peak_height=60, integral=color_integral)
     if edges_approx is not None:
         top, bot, left, right = edges_approx
         corners = _try_hough_refine(color_clean, top, bot, left, right, h, w)
         if corners is not None and _valid_table(corners, h, w):
-            tw_c = np.linalg.norm(corners[1] - corners[0])
-            th_c = np.linalg.norm(corners[3] - corners[0])
-            print(f"  [Strategy 1: Color peak+Hough] {tw_c:.0f}x{th_c:.0f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Strategy 1: Color peak+Hough] %.0fx%.0f", _corner_dist(corners, 1, 0), _corner_dist(corners, 3, 0))
             return corners
         corners = np.array([[left, top], [right, top], [right, bot], [left, bot]], dtype=np.float32)
         if _valid_table(corners, h, w):
-            print(f"  [Strategy 1: Color peak scan] {right - left}x{bot - top}")
+            logger.debug("[Strategy 1: Color peak scan] %dx%d", right - left, bot - top)
             return corners
 
     # Pass 3: Zone profile scan (tight -> medium -> wide)
@@ -754,9 +1188,10 @@ def _strategy_border_lines(frame):
     ]
     edges_approx = None
     for (yf, xf, row_t, col_t) in zone_passes:
-        mask_z, (y1, y2, x1, x2) = _apply_zone(color_clean, h, w, y_frac=yf, x_frac=xf)
-        edges_approx = _profile_scan(mask_z, y1, y2, x1, x2,
-                                      row_thresh_pct=row_t, col_thresh_pct=col_t)
+        y1, y2 = int(h * yf[0]), int(h * yf[1])
+        x1, x2 = int(w * xf[0]), int(w * xf[1])
+        edges_approx = _profile_scan(color_integral, y1, y2, x1, x2,
+                                     row_thresh_pct=row_t, col_thresh_pct=col_t)
         if edges_approx is not None:
             break
 
@@ -764,17 +1199,17 @@ def _strategy_border_lines(frame):
         top, bot, left, right = edges_approx
         corners = _try_hough_refine(color_clean, top, bot, left, right, h, w)
         if corners is not None and _valid_table(corners, h, w):
-            tw_c = np.linalg.norm(corners[1] - corners[0])
-            th_c = np.linalg.norm(corners[3] - corners[0])
-            print(f"  [Strategy 1: Profile+Hough] {tw_c:.0f}x{th_c:.0f}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Strategy 1: Profile+Hough] %.0fx%.0f", _corner_dist(corners, 1, 0), _corner_dist(corners, 3, 0))
             return corners
         corners = np.array([[left, top], [right, top], [right, bot], [left, bot]], dtype=np.float32)
         if _valid_table(corners, h, w):
-            print(f"  [Strategy 1: Profile scan] {right - left}x{bot - top}")
+            logger.debug("[Strategy 1: Profile scan] %dx%d", right - left, bot - top)
             return corners
 
     # Pass 4: Hough-only fallback
-    mask_hough, _ = _apply_zone(color_clean, h, w, y_frac=(0.20, 0.75), x_frac=(0.15, 0.85))
+    mask_hough = color_clean.copy()
+    _clear_outside(mask_hough, int(h * 0.20), int(h * 0.75), int(w * 0.15), int(w * 0.85))
     min_dim = min(w, h)
     for thresh, minLen, maxGap in [(30, max(30, min_dim // 12), max(40, min_dim // 15)),
                                     (20, max(20, min_dim // 18), max(60, min_dim // 10)),
@@ -784,37 +1219,28 @@ def _strategy_border_lines(frame):
         if segs is not None and len(segs) >= 4:
             corners = _median_split_corners(segs.reshape(-1, 4), h, w)
             if corners is not None and _valid_table(corners, h, w):
-                print(f"  [Strategy 1: Hough fallback]")
+                logger.debug("[Strategy 1: Hough fallback]")
                 return corners
 
     return None
 
 
 def _median_split_corners(segs, h, w):
-    horizontals = []
-    verticals = []
-    for seg in segs:
-        x1, y1, x2, y2 = seg
-        angle = _angle_deg(float(x2 - x1), float(y2 - y1))
-        length = _seg_length(seg)
-        if angle < 25:
-            horizontals.append(((y1 + y2) / 2.0, length, seg))
-        elif angle > 65:
-            verticals.append(((x1 + x2) / 2.0, length, seg))
-    if len(horizontals) < 2 or len(verticals) < 2:
+    angle, length = _seg_angle_length(segs)
+    h_mask = angle < 25
+    v_mask = angle > 65
+    if np.count_nonzero(h_mask) < 2 or np.count_nonzero(v_mask) < 2:
         return None
-    y_med = np.median([h_[0] for h_ in horizontals])
-    x_med = np.median([v_[0] for v_ in verticals])
-    top_segs = [(y, l, s) for y, l, s in horizontals if y < y_med]
-    bot_segs = [(y, l, s) for y, l, s in horizontals if y >= y_med]
-    left_segs = [(x, l, s) for x, l, s in verticals if x < x_med]
-    right_segs = [(x, l, s) for x, l, s in verticals if x >= x_med]
-    if not all([top_segs, bot_segs, left_segs, right_segs]):
+    pts = np.asarray(segs, dtype=np.float64)
+    y_mid = (pts[:, 1] + pts[:, 3]) / 2.0
+    x_mid = (pts[:, 0] + pts[:, 2]) / 2.0
+    y_med = np.median(y_mid[h_mask])
+    x_med = np.median(x_mid[v_mask])
+    picks = [_longest(length, h_mask & (y_mid < y_med)), _longest(length, h_mask & (y_mid >= y_med)),
+             _longest(length, v_mask & (x_mid < x_med)), _longest(length, v_mask & (x_mid >= x_med))]
+    if min(picks) < 0:
         return None
-    top_s = max(top_segs, key=lambda t: t[1])[2]
-    bot_s = max(bot_segs, key=lambda t: t[1])[2]
-    left_s = max(left_segs, key=lambda t: t[1])[2]
-    right_s = max(right_segs, key=lambda t: t[1])[2]
+    top_s, bot_s, left_s, right_s = (segs[k] for k in picks)
     tl = _line_intersection((top_s[0], top_s[1]), (top_s[2], top_s[3]),
                             (left_s[0], left_s[1]), (left_s[2], left_s[3]))
     tr = _line_intersection((top_s[0], top_s[1]), (top_s[2], top_s[3]),
@@ -832,45 +1258,60 @@ def _median_split_corners(segs, h, w):
 # STRATEGY 2: Rectangle detection
 # ============================================================
 
+# Smallest quad area (px^2) _strategy_rectangle keeps
+_MIN_RECT_AREA = 2000
+# Binarization thresholds for levels 1-10 of the rectangle search (level 0 is Canny)
+_RECT_LEVEL_THRESHOLDS = tuple(int((lev + 1) * 255 / 11) for lev in range(1, 11))
+
+
 def _strategy_rectangle(frame):
     h, w = frame.shape[:2]
     pyr = cv2.pyrDown(frame)
     timg = cv2.pyrUp(pyr, dstsize=(w, h))
     candidates = []
-    for c in range(3):
-        gray0 = timg[:, :, c]
+    # Split once: a channel slice of timg is strided, and OpenCV would copy it for every level
+    # findContours doesn't modify its input, so every level is binarized into one buffer
+    level_buf = _scratch.get('rect_level', (h, w))
+    for gray0 in cv2.split(timg):
         for lev in range(11):
             if lev == 0:
                 gray = cv2.Canny(gray0, 0, 50, apertureSize=5)
-                gray = cv2.dilate(gray, None)
+                gray = cv2.dilate(gray, None, dst=level_buf)
             else:
-                _, gray = cv2.threshold(gray0, int((lev + 1) * 255 / 11), 255, cv2.THRESH_BINARY)
+                _, gray = cv2.threshold(gray0, _RECT_LEVEL_THRESHOLDS[lev - 1], 255, cv2.THRESH_BINARY,
+                                        dst=level_buf)
             contours, _ = cv2.findContours(gray, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
             for cnt in contours:
+                if len(cnt) < 4:
+                    continue
                 peri = cv2.arcLength(cnt, True)
+                # The simplified polygon keeps a subset of the contour's points, so its
+                # perimeter is at most `peri` and its area at most peri^2 / 4pi
+                if peri * peri < _MIN_RECT_AREA * 4 * math.pi:
+                    continue
                 approx = cv2.approxPolyDP(cnt, 0.02 * peri, True)
                 if len(approx) != 4:
                     continue
                 area = abs(cv2.contourArea(approx))
-                if area < 2000 or area > h * w * 0.5:
-                    continue
-                if not cv2.isContourConvex(approx):
+                if area < _MIN_RECT_AREA or area > h * w * 0.5:
                     continue
                 pts = approx.reshape(4, 2).astype(float)
-                max_cosine = 0
+                # Cosine at corners 1-3 on plain floats, before the costlier convexity test
+                p = pts.tolist()
+                max_cosine = 0.0
                 for j in range(2, 5):
-                    v1 = pts[j % 4] - pts[(j - 1) % 4]
-                    v2 = pts[(j - 2) % 4] - pts[(j - 1) % 4]
-                    cosine = abs(np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-10))
+                    (ax, ay), (bx, by), (cx, cy) = p[j % 4], p[(j - 1) % 4], p[(j - 2) % 4]
+                    v1x, v1y, v2x, v2y = ax - bx, ay - by, cx - bx, cy - by
+                    cosine = abs((v1x * v2x + v1y * v2y) / (math.hypot(v1x, v1y) * math.hypot(v2x, v2y) + 1e-10))
                     max_cosine = max(max_cosine, cosine)
-                if max_cosine < 0.3:
+                if max_cosine < 0.3 and cv2.isContourConvex(approx):
                     corners = _order_corners(pts)
                     if _valid_table(corners, h, w):
                         candidates.append((area, corners))
     if not candidates:
         return None
     candidates.sort(key=lambda x: x[0], reverse=True)
-    print(f"  [Strategy 2: Rectangle] Found {len(candidates)} candidates")
+    logger.debug("[Strategy 2: Rectangle] Found %d candidates", len(candidates))
     return candidates[0][1]
 
 
@@ -878,17 +1319,30 @@ def _strategy_rectangle(frame):
 # STRATEGY 3: K-means + Hough
 # ============================================================
 
+# The colour clusters are fitted on every 4th pixel in each direction; the blurred frame
+# has no detail at that scale, and every pixel is still labelled at full resolution
+_KMEANS_SAMPLE_STEP = 4
+
+
+def _nearest_center_mask(img, centers, idx):
+    """255 where a pixel's nearest centre (squared L2) is centers[idx], else 0."""
+    c = centers[idx]
+    others = np.delete(centers, idx, axis=0)
+    # x is nearer c than o  <=>  2x.(o - c) + |c|^2 - |o|^2 < 0, one affine map per other centre
+    affine = np.hstack([2 * (others - c), (c @ c - np.sum(others * others, axis=1))[:, None]])
+    margins = cv2.transform(img.astype(np.float32), affine.astype(np.float32))
+    return np.uint8(np.all(margins < 0, axis=2)) * 255
+
+
 def _kmeans_binarize(frame):
     h, w = frame.shape[:2]
     blurred = cv2.GaussianBlur(frame, (15, 15), 0)
-    pixels = blurred.reshape(-1, 3).astype(np.float32)
+    sample = blurred[::_KMEANS_SAMPLE_STEP, ::_KMEANS_SAMPLE_STEP].reshape(-1, 3).astype(np.float32)
     criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
-    _, labels, centers = cv2.kmeans(pixels, 4, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+    _, _, centers = cv2.kmeans(sample, 4, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
     line_idx = int(np.argmax(np.sum(centers, axis=1)))
-    labels = labels.reshape(h, w)
-    bin_img = np.uint8((labels == line_idx) * 255)
-    kern_open = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (15, 15))
-    opened = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, kern_open)
+    bin_img = _nearest_center_mask(blurred, centers, line_idx)
+    opened = cv2.morphologyEx(bin_img, cv2.MORPH_OPEN, _K15_ELLIPSE)
     lines_only = cv2.subtract(bin_img, opened)
     close_sz = min(101, max(21, w // 12))
     if close_sz % 2 == 0:
@@ -932,44 +1386,50 @@ def _hough_classify_intersect(edge_img, w, h):
         if not (h_up and h_down and v_left and v_right):
             return None
 
-    def intersect_all(horiz, vert):
-        pts = []
-        for hl in horiz:
-            for vl in vert:
-                p = _line_intersection((hl[0], hl[1]), (hl[2], hl[3]),
-                                       (vl[0], vl[1]), (vl[2], vl[3]))
-                if p and 0 <= p[0] <= w and 0 <= p[1] <= h:
-                    pts.append(p)
-        return pts
-
-    center = np.array([cx, cy])
-    def farthest(pts):
-        if not pts: return None
-        return max(pts, key=lambda p: np.linalg.norm(np.array(p) - center))
-
-    tl = farthest(intersect_all(h_up, v_left))
-    tr = farthest(intersect_all(h_up, v_right))
-    br = farthest(intersect_all(h_down, v_right))
-    bl = farthest(intersect_all(h_down, v_left))
+    def farthest_intersection(horiz, vert):
+        """In-frame intersection of any horizontal with any vertical line farthest from the centre."""
+        hs = np.asarray(horiz, dtype=np.float64)[:, None, :]
+        vs = np.asarray(vert, dtype=np.float64)[None, :, :]
+        x1, y1, x2, y2 = hs[..., 0], hs[..., 1], hs[..., 2], hs[..., 3]
+        x3, y3, x4, y4 = vs[..., 0], vs[..., 1], vs[..., 2], vs[..., 3]
+        # Same parametric form as _line_intersection, for all H x V pairs at once
+        d1x, d1y = x2 - x1, y2 - y1
+        d2x, d2y = x4 - x3, y4 - y3
+        cross = d1x * d2y - d1y * d2x
+        ok = np.abs(cross) >= 1e-8
+        t = ((x3 - x1) * d2y - (y3 - y1) * d2x) / np.where(ok, cross, 1.0)
+        px = x1 + d1x * t
+        py = y1 + d1y * t
+        ok &= (px >= 0) & (px <= w) & (py >= 0) & (py <= h)
+        if not ok.any():
+            return None
+        k = int(np.argmax(np.where(ok, np.hypot(px - cx, py - cy), -1.0)))
+        return float(px.flat[k]), float(py.flat[k])
+
+    tl = farthest_intersection(h_up, v_left)
+    tr = farthest_intersection(h_up, v_right)
+    br = farthest_intersection(h_down, v_right)
+    bl = farthest_intersection(h_down, v_left)
     if any(c is None for c in [tl, tr, br, bl]):
         return None
     return np.array([tl, tr, br, bl], dtype=np.float32)
 
 
-def _strategy_kmeans_hough(frame):
+def _strategy_kmeans_hough(frame, gray=None):
     h, w = frame.shape[:2]
     line_bin = _kmeans_binarize(frame)
     edges = cv2.Canny(line_bin, 50, 150)
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if gray is None:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     edges2 = cv2.Canny(gray, 50, 200, apertureSize=3)
     combined = cv2.bitwise_or(edges, edges2)
     corners = _hough_classify_intersect(combined, w, h)
     if corners is not None and _valid_table(corners, h, w):
-        print("  [Strategy 3: K-means+Hough] Table found!")
+        logger.debug("[Strategy 3: K-means+Hough] Table found!")
         return corners
     corners = _hough_classify_intersect(line_bin, w, h)
     if corners is not None and _valid_table(corners, h, w):
-        print("  [Strategy 3: K-means binary+Hough] Table found!")
+        logger.debug("[Strategy 3: K-means binary+Hough] Table found!")
         return corners
     return None
 
@@ -978,13 +1438,14 @@ def _strategy_kmeans_hough(frame):
 # STRATEGY 4: Direct Canny + Hough
 # ============================================================
 
-def _strategy_direct_hough(frame):
+def _strategy_direct_hough(frame, gray=None):
     h, w = frame.shape[:2]
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if gray is None:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     canny = cv2.Canny(gray, 50, 200, apertureSize=3)
     corners = _hough_classify_intersect(canny, w, h)
     if corners is not None and _valid_table(corners, h, w):
-        print("  [Strategy 4: Direct Hough] Table found!")
+        logger.debug("[Strategy 4: Direct Hough] Table found!")
         return corners
     return None
 
@@ -993,20 +1454,16 @@ def _strategy_direct_hough(frame):
 # STRATEGY 5: Surface color (last resort)
 # ============================================================
 
-def _strategy_surface_color(frame):
+def _strategy_surface_color(frame, hsv=None):
     h, w = frame.shape[:2]
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    blue_mask = cv2.inRange(hsv, (95, 60, 40), (125, 255, 200))
-    green_mask = cv2.inRange(hsv, (40, 60, 40), (80, 255, 200))
-    table_mask = blue_mask | green_mask
-    zone = np.zeros_like(table_mask)
-    y1z, y2z = int(h * 0.20), int(h * 0.70)
-    x1z, x2z = int(w * 0.20), int(w * 0.80)
-    zone[y1z:y2z, x1z:x2z] = 255
-    table_mask = table_mask & zone
-    k = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-    table_mask = cv2.morphologyEx(table_mask, cv2.MORPH_CLOSE, k, iterations=3)
-    table_mask = cv2.morphologyEx(table_mask, cv2.MORPH_OPEN, k, iterations=2)
+    if hsv is None:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    table_mask = cv2.inRange(hsv, (95, 60, 40), (125, 255, 200), dst=_scratch.get('surface', (h, w)))
+    green_mask = cv2.inRange(hsv, (40, 60, 40), (80, 255, 200), dst=_scratch.get('surface_tmp', (h, w)))
+    cv2.bitwise_or(table_mask, green_mask, dst=table_mask)
+    _clear_outside(table_mask, int(h * 0.20), int(h * 0.70), int(w * 0.20), int(w * 0.80))
+    closed = cv2.morphologyEx(table_mask, cv2.MORPH_CLOSE, _K7_ELLIPSE, dst=green_mask, iterations=3)
+    table_mask = cv2.morphologyEx(closed, cv2.MORPH_OPEN, _K7_ELLIPSE, dst=table_mask, iterations=2)
     contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if not contours:
         return None
@@ -1019,13 +1476,13 @@ def _strategy_surface_color(frame):
         if len(approx) == 4:
             corners = _order_corners(approx.reshape(-1, 2))
             if _valid_table(corners, h, w):
-                print("  [Strategy 5: Surface color] Table found!")
+                logger.debug("[Strategy 5: Surface color] Table found!")
                 return corners
         rect = cv2.minAreaRect(cnt)
         box = cv2.boxPoints(rect)
         corners = _order_corners(box)
         if _valid_table(corners, h, w):
-            print("  [Strategy 5: Surface color minAreaRect] Table found!")
+            logger.debug("[Strategy 5: Surface color minAreaRect] Table found!")
             return corners
     return None
 
@@ -1034,28 +1491,65 @@ def _strategy_surface_color(frame):
 # PUBLIC API
 # ============================================================
 
+# The strategies' pixel thresholds are tuned on ~720p footage; larger frames are detected
+# downscaled to this long side and the results mapped back
+_DETECT_MAX_SIZE = 1280
+
+
 def detect_table_corners(frame):
     """
     Returns (corners, net_y) or just corners for backward compat.
     corners: np.array (4,2) [TL, TR, BR, BL] or None.
     net_y: int y-coordinate of detected net, or None.
     """
-    print("  Court detection: trying strategies...")
+    h, w = frame.shape[:2]
+    if max(h, w) <= _DETECT_MAX_SIZE:
+        return _run_strategies(frame)
+    scale = _DETECT_MAX_SIZE / max(h, w)
+    small = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    corners, net_y = _run_strategies(small)
+    sx = w / small.shape[1]
+    sy = h / small.shape[0]
+    if corners is not None:
+        corners = corners * np.float32([sx, sy])
+    if net_y is not None:
+        net_y = int(round(net_y * sy))
+    return corners, net_y
+
+
+def _run_strategies(frame):
+    try:
+        return _try_strategies(frame)
+    finally:
+        _frame_hsv.clear()
+
+
+def _try_strategies(frame):
+    logger.debug("Court detection: trying strategies...")
 
     # Strategy 0: Find 5 lines (4 edges + net) that form the table rectangle
     corners, net_y = _strategy_find_table_lines(frame)
     if corners is not None:
         return corners, net_y
 
-    # Fallback strategies (return corners only, net_y=None)
-    for strategy in [_strategy_border_lines, _strategy_rectangle,
-                     _strategy_kmeans_hough, _strategy_direct_hough,
-                     _strategy_surface_color]:
-        corners = strategy(frame)
-        if corners is not None:
-            return corners, None
+    # Fallback strategies (return corners only, net_y=None). The full-frame HSV and gray
+    # conversions are made once here and shared, and only once a fallback is needed (strategy 0
+    # may already have converted the frame for its full-resolution surface search)
+    hsv = _frame_hsv.get(frame) if _gpu_border_masks is None else None
+    corners = _strategy_border_lines(frame, hsv=hsv)
+    if corners is None:
+        corners = _strategy_rectangle(frame)
+    if corners is None:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        corners = _strategy_kmeans_hough(frame, gray=gray)
+        if corners is None:
+            corners = _strategy_direct_hough(frame, gray=gray)
+    if corners is None:
+        corners = _strategy_surface_color(frame, hsv=hsv)
+    if corners is not None:
+        return corners, None
 
-    print("  All strategies failed.")
+    logger.warning("Court detection: all strategies failed.")
     return None, None
 
 
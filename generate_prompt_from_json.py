@@ -1,6 +1,5 @@
 import sys
 import os
-import json
 
 # Ensure root directory is in path
 sys.path.append(os.getcwd())
@@ -17,8 +16,8 @@ def generate_and_save_prompt():
         print(f"Error: File {json_path} not found.")
         return
 
-    with open(json_path, 'r') as f:
-        match_data = json.load(f)
+    with open(json_path, 'rb') as f:
+        match_data = StatsEngine.parse(f.read())
     print(f"Loaded JSON: {match_data.get('video', 'Unknown Video')}")
 
     # 2. Process with StatsEngine
@@ -20,7 +20,9 @@ import sys
 import asyncio
 import json
 import random
-from typing import Optional, Dict, Any, List
+import re
+from dataclasses import dataclass, field, fields
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -31,6 +33,12 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
+# Optional faster JSON parsing of the agent's report
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Dedalus SDK imports
 try:
     from dedalus_labs import AsyncDedalus, DedalusRunner
@@ -45,12 +53,13 @@ except ImportError:
 # Local imports
 try:
     from modules.snowflake_db import SnowflakeDB
-    from modules.snowflake_mcp import SNOWFLAKE_TOOLS
+    from modules.snowflake_mcp import SNOWFLAKE_TOOLS, warm_up as warm_up_snowflake
 except ImportError:
+    warm_up_snowflake = None
     try:
         from snowflake_db import SnowflakeDB
         try:
-            from snowflake_mcp import SNOWFLAKE_TOOLS
+            from snowflake_mcp import SNOWFLAKE_TOOLS, warm_up as warm_up_snowflake
         except ImportError:
             SNOWFLAKE_TOOLS = []
     except ImportError:
@@ -133,6 +142,72 @@ def calculate_coach_score(biomech_score: int, tactical_score: int, timing_score:
     return {"overall_score": round(overall), "confidence": "High" if overall >= 75 else "Medium"}
 
 
+# Appended to the analysis instructions when a compact report is requested
+COMPACT_OUTPUT_INSTRUCTION = "Return the JSON minified on a single line, with no indentation, newlines or spaces between tokens.\n"
+
+# Top-level keys of the coaching report, in the order the UI draws them
+REPORT_SECTIONS = ("snapshot", "key_findings", "recommendations", "mental_pattern", "confidence_score")
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    shots_analyzed: int = 0
+    rallies: int = 0
+    style: str = "Unknown"
+    pressure_behavior: str = "Stable"
+
+
+@dataclass(frozen=True, slots=True)
+class MentalPattern:
+    insight: str = "No pattern detected"
+    fix: str = "Keep playing focused"
+
+
+@dataclass(frozen=True, slots=True)
+class AnalysisResult:
+    """
+    Coaching report with every section defaulted, so renderers read attributes directly
+
+    Attributes mirror REPORT_SECTIONS; unknown keys in the raw report are dropped.
+    """
+    snapshot: Snapshot = field(default_factory=Snapshot)
+    key_findings: Tuple[str, ...] = ()
+    recommendations: Tuple[str, ...] = ()
+    mental_pattern: MentalPattern = field(default_factory=MentalPattern)
+    confidence_score: int = 0
+
+    @classmethod
+    def from_dict(cls, report: dict) -> "AnalysisResult":
+        """Build from a parsed report; sections of the wrong type (e.g. a string snapshot) keep their defaults."""
+        report = report if isinstance(report, dict) else {}
+        confidence = report.get("confidence_score", 0)
+        return cls(
+            snapshot=_from_known_keys(Snapshot, report.get("snapshot")),
+            key_findings=_as_tuple(report.get("key_findings")),
+            recommendations=_as_tuple(report.get("recommendations")),
+            mental_pattern=_from_known_keys(MentalPattern, report.get("mental_pattern")),
+            confidence_score=confidence if isinstance(confidence, (int, float)) else 0,
+        )
+
+
+def _loads(text: str):
+    """Parse JSON with orjson when installed. Both raise json.JSONDecodeError subclasses on bad input."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _from_known_keys(cls, values: Optional[dict]):
+    """Build `cls` from the keys of `values` it declares; missing ones, or a non-dict `values`, keep the defaults."""
+    values = values if isinstance(values, dict) else {}
+    return cls(**{f.name: values[f.name] for f in fields(cls) if f.name in values})
+
+
+def _as_tuple(items) -> tuple:
+    """A list section as a tuple; anything else (a bare string would split into characters) is empty."""
+    return tuple(items) if isinstance(items, (list, tuple)) else ()
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # DEDALUS COACH CLASS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -201,19 +276,36 @@ Do not include markdown formatting like ```json ... ```. Just return the raw JSO
     # ANALYSIS METHODS
     # ------------------------------------------------------------------------
 
-    async def analyze_match_async(self, match_stats: dict) -> str:
-        """Run multi-agent analysis on match stats."""
+    async def analyze_match_async(self, match_stats: dict, compact: bool = True) -> str:
+        """Run multi-agent analysis on match stats.
+        With compact=True the report is requested as minified JSON, which is fewer tokens to generate and parse."""
         # CHECK: If we can run real analysis
         if DEDALUS_AVAILABLE and self.api_key:
-            return await self._run_real_analysis(match_stats)
+            return await self._run_real_analysis(match_stats, compact)
         else:
             print("[DedalusCoach] Simulation Mode Active (Missing Key or Package)")
-            return self._run_simulated_analysis(match_stats)
+            return self._run_simulated_analysis(match_stats, compact)
+
+    async def prefetch_context_async(self) -> bool:
+        """Warm what the analysis needs that does not depend on the match stats (the Snowflake
+        connection behind the history tools), so it can overlap stats processing."""
+        if not (DEDALUS_AVAILABLE and self.api_key) or warm_up_snowflake is None:
+            return False
+        return await asyncio.to_thread(warm_up_snowflake)
+
+    async def process_and_prefetch_async(self, process, *args):
+        """Run the blocking `process(*args)` on a thread while the analysis context is prefetched; returns its result."""
+        result, _ = await asyncio.gather(asyncio.to_thread(process, *args), self.prefetch_context_async())
+        return result
 
-    def analyze_match(self, match_stats: dict) -> str:
-        return asyncio.run(self.analyze_match_async(match_stats))
+    def analyze_match(self, match_stats: dict, compact: bool = True) -> str:
+        return asyncio.run(self.analyze_match_async(match_stats, compact))
 
-    async def _run_real_analysis(self, match_stats: dict) -> str:
+    def analyze_match_report(self, match_stats: dict, compact: bool = True) -> AnalysisResult:
+        """Run analyze_match and parse its JSON into an AnalysisResult; bad JSON raises json.JSONDecodeError."""
+        return AnalysisResult.from_dict(_loads(self.analyze_match(match_stats, compact)))
+
+    async def _run_real_analysis(self, match_stats: dict, compact: bool = True) -> str:
         try:
             input_summary = self._prepare_input(match_stats)
             client = AsyncDedalus(api_key=self.api_key)
@@ -222,14 +314,14 @@ Do not include markdown formatting like ```json ... ```. Just return the raw JSO
                 input=input_summary,
                 model=self.models,
                 tools=self.tools,
-                instructions=self.instructions,
+                instructions=self.instructions + COMPACT_OUTPUT_INSTRUCTION if compact else self.instructions,
                 stream=False,
             )
             return response.final_output
         except Exception as e:
             return json.dumps({"error": str(e)})
 
-    def _run_simulated_analysis(self, match_stats: dict) -> str:
+    def _run_simulated_analysis(self, match_stats: dict, compact: bool = True) -> str:
         """Return a realistic JSON response based on basic stats."""
         rallies = len(match_stats.get('rallies', []))
         return json.dumps({
@@ -254,7 +346,7 @@ Do not include markdown formatting like ```json ... ```. Just return the raw JSO
                 "fix": "Use a 'reset trigger' like wiping your hand on the table."
             },
             "confidence_score": 85
-        })
+        }, separators=(',', ':') if compact else None)
 
     # ------------------------------------------------------------------------
     # CHAT METHODS
@@ -270,7 +362,30 @@ Do not include markdown formatting like ```json ... ```. Just return the raw JSO
     def chat(self, query: str, match_stats: Optional[dict] = None) -> str:
         return asyncio.run(self.chat_async(query, match_stats))
 
-    async def _run_real_chat(self, query: str, match_stats: dict) -> str:
+    async def chat_stream_async(self, query: str, match_stats: Optional[dict] = None) -> AsyncIterator[str]:
+        """Chat with the coach, yielding the reply in chunks as it is generated."""
+        if DEDALUS_AVAILABLE and self.api_key:
+            async for chunk in self._run_real_chat_stream(query, match_stats):
+                yield chunk
+        else:
+            for chunk in re.findall(r"\s*\S+\s*", self._run_simulated_chat(query)):
+                yield chunk
+
+    def chat_stream(self, query: str, match_stats: Optional[dict] = None) -> Iterator[str]:
+        """Synchronous wrapper around chat_stream_async, e.g. for st.write_stream."""
+        loop = asyncio.new_event_loop()
+        chunks = self.chat_stream_async(query, match_stats)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(chunks.aclose())
+            loop.close()
+
+    def _chat_run_kwargs(self, query: str, match_stats: Optional[dict]) -> dict:
         chat_instructions = """You are a helpful and knowledgeable table tennis coaching assistant.
         
 You have access to:
@@ -289,22 +404,36 @@ When answering:
             context_str = f"\n=== CURRENT MATCH CONTEXT ===\n{self._prepare_input(match_stats)}\n=============================\n"
         
         full_prompt = f"{context_str}\nUser Question: {query}"
-        
+        return dict(
+            input=full_prompt,
+            model=self.models,
+            tools=self.tools,
+            instructions=chat_instructions,
+            max_steps=10,
+        )
+
+    async def _run_real_chat(self, query: str, match_stats: dict) -> str:
         try:
             client = AsyncDedalus(api_key=self.api_key)
             runner = DedalusRunner(client)
-            response = await runner.run(
-                input=full_prompt,
-                model=self.models,
-                tools=self.tools,
-                instructions=chat_instructions,
-                max_steps=10, 
-                stream=False
-            )
+            response = await runner.run(**self._chat_run_kwargs(query, match_stats), stream=False)
             return response.final_output
         except Exception as e:
             return f"Error generation response: {str(e)}"
 
+    async def _run_real_chat_stream(self, query: str, match_stats: dict) -> AsyncIterator[str]:
+        """Yield the reply's text deltas. API errors propagate to the caller instead of
+        being turned into reply text, so a failed request can't pass for an answer."""
+        client = AsyncDedalus(api_key=self.api_key)
+        runner = DedalusRunner(client)
+        # With an AsyncDedalus client and stream=True, DedalusRunner.run returns an async
+        # generator (not a coroutine) of chat-completion chunks for every step; tool-call
+        # deltas carry no content and are skipped
+        async for chunk in runner.run(**self._chat_run_kwargs(query, match_stats), stream=True):
+            choices = getattr(chunk, "choices", None)
+            if choices and choices[0].delta and choices[0].delta.content:
+                yield choices[0].delta.content
+
     def _run_simulated_chat(self, query: str) -> str:
         """Simple keyword-based responses for demo."""
         q = query.lower()
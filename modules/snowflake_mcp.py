@@ -287,6 +287,11 @@ def _get_server():
     return _mcp_server
 
 
+def warm_up() -> bool:
+    """Open the Snowflake connection ahead of the first tool call."""
+    return _get_server().connect()
+
+
 def query_similar_matches(player_style: str, shot_pattern: str, limit: int = 5) -> dict:
     """
     Find historically similar matches from Snowflake using vector search.
@@ -0,0 +1,94 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+import court_lines_detector as cld
+
+
+def make_frame():
+    """Noisy frame with a pink table border, so both border masks have content."""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (60, 80), (260, 170), (180, 60, 230), 3)
+    return frame
+
+
+@contextmanager
+def stub_gpu(masks_fn):
+    """Install `masks_fn` as the GPU mask builder, unverified, and restore the module state after."""
+    saved = cld._gpu_border_masks, cld._gpu_masks_verified
+    cld._gpu_border_masks, cld._gpu_masks_verified = masks_fn, False
+    try:
+        yield
+    finally:
+        cld._gpu_border_masks, cld._gpu_masks_verified = saved
+
+
+def test_gpu_masks_used_when_they_match_cpu():
+    frame = make_frame()
+    with stub_gpu(cld._cpu_border_masks):
+        masks = cld._border_masks_gpu(frame)
+        assert masks is not None
+        assert cld._gpu_masks_verified
+        for gpu, cpu in zip(masks, cld._cpu_border_masks(frame)):
+            assert np.array_equal(gpu, cpu)
+
+
+def test_gpu_mask_mismatch_falls_back_to_cpu():
+    frame = make_frame()
+    with stub_gpu(lambda f: tuple(255 - m for m in cld._cpu_border_masks(f))):
+        assert cld._border_masks_gpu(frame) is None
+        assert cld._gpu_border_masks is None
+        # Strategy 1 still runs, on the CPU masks
+        cld._strategy_border_lines(frame)
+
+
+def test_gpu_error_after_check_falls_back_to_cpu():
+    frame = make_frame()
+    calls = []
+
+    def flaky(f):
+        calls.append(f)
+        if len(calls) > 1:
+            raise cv2.error("device lost")
+        return cld._cpu_border_masks(f)
+
+    with stub_gpu(flaky):
+        assert cld._border_masks_gpu(frame) is None
+        assert cld._gpu_border_masks is None
+
+
+def test_first_frame_check_runs_once_across_threads():
+    frame = make_frame()
+    checks = []
+
+    def slow(f):
+        if not cld._gpu_masks_verified:
+            checks.append(f)
+            time.sleep(0.05)
+        return cld._cpu_border_masks(f)
+
+    with stub_gpu(slow):
+        results = [None] * 8
+
+        def run(i):
+            results[i] = cld._border_masks_gpu(frame)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(results))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(checks) == 1
+        assert all(r is not None for r in results)
+
+
+if __name__ == "__main__":
+    test_gpu_masks_used_when_they_match_cpu()
+    test_gpu_mask_mismatch_falls_back_to_cpu()
+    test_gpu_error_after_check_falls_back_to_cpu()
+    test_first_frame_check_runs_once_across_threads()
+    print("court_lines_detector GPU fallback tests passed.")
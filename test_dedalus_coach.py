@@ -0,0 +1,145 @@
+import sys
+import types
+
+# The coach's Snowflake tools need a live account; these tests only exercise the
+# Dedalus runner path, so the Snowflake modules are replaced before the import
+_snowflake_db = types.ModuleType("modules.snowflake_db")
+_snowflake_db.SnowflakeDB = type("SnowflakeDB", (), {})
+_snowflake_mcp = types.ModuleType("modules.snowflake_mcp")
+_snowflake_mcp.SNOWFLAKE_TOOLS = []
+_snowflake_mcp.warm_up = lambda: False
+sys.modules.setdefault("modules.snowflake_db", _snowflake_db)
+sys.modules.setdefault("modules.snowflake_mcp", _snowflake_mcp)
+
+from modules import dedalus_coach  # noqa: E402
+
+
+def make_chunk(content=None, finish_reason=None):
+    """A chat.completion.chunk payload as the Dedalus API streams it."""
+    delta = {"role": "assistant", "content": content}
+    return {
+        "id": "chunk", "object": "chat.completion.chunk", "created": 0, "model": "test-model",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+REPLY = ["Widen ", "your ", "stance."]
+STREAM = [make_chunk(c) for c in REPLY] + [make_chunk(finish_reason="stop")]
+
+
+def real_path_coach(client_factory):
+    """A coach forced onto the real-API path, with `client_factory` standing in for AsyncDedalus."""
+    coach = dedalus_coach.DedalusCoach()
+    coach.api_key = "test-key"
+    saved = dedalus_coach.DEDALUS_AVAILABLE, dedalus_coach.__dict__.get("AsyncDedalus")
+    dedalus_coach.DEDALUS_AVAILABLE = True
+    dedalus_coach.AsyncDedalus = client_factory
+
+    def restore():
+        dedalus_coach.DEDALUS_AVAILABLE, dedalus_coach.AsyncDedalus = saved
+    return coach, restore
+
+
+def test_chat_stream_through_sdk_runner():
+    """The real DedalusRunner, fed by a client whose completions endpoint is mocked."""
+    try:
+        from dedalus_labs import AsyncDedalus, DedalusRunner
+        from dedalus_labs.types.chat import ChatCompletionChunk
+    except ImportError:
+        print("dedalus_labs not installed; skipping the SDK runner test")
+        return
+
+    requests = []
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+
+        async def chunks():
+            for payload in STREAM:
+                yield ChatCompletionChunk.model_validate(payload)
+        return chunks()
+
+    def client_factory(api_key):
+        client = AsyncDedalus(api_key=api_key)
+        client.chat.completions.create = create
+        return client
+
+    saved_runner = dedalus_coach.__dict__.get("DedalusRunner")
+    dedalus_coach.DedalusRunner = DedalusRunner
+    coach, restore = real_path_coach(client_factory)
+    try:
+        reply = list(coach.chat_stream("How is my footwork?"))
+    finally:
+        restore()
+        dedalus_coach.DedalusRunner = saved_runner
+    assert reply == REPLY
+    assert requests and requests[0]["stream"] is True
+
+
+class FakeRunner:
+    """Stands in for DedalusRunner: run(stream=True) returns an async generator of chunk objects."""
+    error = None
+
+    def __init__(self, client):
+        self.client = client
+
+    def run(self, stream=False, **kwargs):
+        assert stream
+        error = self.error
+
+        async def chunks():
+            for payload in STREAM:
+                choices = [types.SimpleNamespace(delta=types.SimpleNamespace(**c["delta"]))
+                           for c in payload["choices"]]
+                yield types.SimpleNamespace(choices=choices)
+                if error is not None:
+                    raise error
+        return chunks()
+
+
+def run_with_fake_runner(error=None):
+    saved_runner = dedalus_coach.__dict__.get("DedalusRunner")
+    dedalus_coach.DedalusRunner = type("FailingRunner", (FakeRunner,), {"error": error})
+    coach, restore = real_path_coach(lambda api_key: None)
+    try:
+        return list(coach.chat_stream("How is my footwork?"))
+    finally:
+        restore()
+        dedalus_coach.DedalusRunner = saved_runner
+
+
+def test_chat_stream_with_fake_runner():
+    assert run_with_fake_runner() == REPLY
+
+
+def test_chat_stream_errors_propagate():
+    try:
+        reply = run_with_fake_runner(error=ConnectionError("connection reset"))
+    except ConnectionError:
+        return
+    raise AssertionError(f"error was turned into reply text: {reply!r}")
+
+
+def test_analysis_result_ignores_malformed_sections():
+    AnalysisResult = dedalus_coach.AnalysisResult
+    result = AnalysisResult.from_dict({
+        "snapshot": "12 shots",
+        "key_findings": "Late on the forehand",
+        "recommendations": {"1": "Step in"},
+        "mental_pattern": ["Freezes after errors"],
+        "confidence_score": "high",
+    })
+    assert result == AnalysisResult()
+    assert AnalysisResult.from_dict(["not", "a", "report"]) == AnalysisResult()
+
+    result = AnalysisResult.from_dict({"key_findings": ["Late on the forehand"], "snapshot": {"rallies": 4}})
+    assert result.key_findings == ("Late on the forehand",)
+    assert result.snapshot.rallies == 4
+
+
+if __name__ == "__main__":
+    test_chat_stream_through_sdk_runner()
+    test_chat_stream_with_fake_runner()
+    test_chat_stream_errors_propagate()
+    test_analysis_result_ignores_malformed_sections()
+    print("DedalusCoach tests passed.")